@@ -13,37 +13,304 @@ import sys
 import time
 import json
 import gzip
-from collections import Counter, defaultdict
 import argparse
 import logging
-from typing import Dict, List, Set, Tuple, Optional
+from typing import Dict, Iterator, List, Set, Tuple, Optional
 import re
 import csv
-from io import StringIO
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+from operator import itemgetter
+import io
+import codecs
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 except ImportError:
     print("Error: 'requests' module is required but not installed.")
     print("Please install it using: pip3 install requests")
     sys.exit(1)
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa = pc = pa_csv = None
+
 logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-class FastPfamOMAAnalyzer:
+_OMA_RE = re.compile(r'[A-Z]{7}')
+
+# Columns of the UniProt TSV, in the order requested by get_oma_proteins
+_TSV_COLUMNS = ('Entry', 'Entry Name', 'Protein names', 'Pfam', 'OMA', 'Reviewed')
+
+# Number of OMA fingerprints OR-ed into one UniProt query (keeps the URL well under length limits)
+_OMA_BATCH_SIZE = 64
+
+# HTTP statuses UniProt answers a query too large to run with (bad request,
+# payload too large, URI too long)
+_REJECTED_QUERY_STATUSES = {400, 413, 414}
+
+# Read/decompression buffer for streamed responses (matches CPython's gzip READ_BUFFER_SIZE)
+_READ_BUFFER_SIZE = 128 * 1024
+
+
+# str.translate table deleting ASCII control characters other than tab/newline
+_CTRL_TABLE = dict.fromkeys(range(32))
+_CTRL_TABLE[9] = 9
+_CTRL_TABLE[10] = 10
+
+# The same characters as a regex, for cleaning whole pyarrow columns at once
+_CTRL_PATTERN = r'[\x00-\x08\x0b-\x1f]'
+
+# Errors that end a TSV download early; the rows parsed before them are kept
+_TSV_ERRORS = (csv.Error,) if pa is None else (csv.Error, pa.ArrowInvalid)
+
+
+def _valid_pfam(pfam_id: str) -> bool:
+    """
+    Check for a Pfam accession of the form PF##### without the regex engine.
+    """
+    return len(pfam_id) == 7 and pfam_id[:2] == 'PF' and pfam_id[2:].isdecimal()
+
+
+def _query_rejected(response: Optional[requests.Response]) -> bool:
+    """
+    Tell whether UniProt refused a query for its size (too long, too many
+    clauses) rather than failing to answer it.
+    """
+    if response is None:
+        return False
+    if response.status_code in _REJECTED_QUERY_STATUSES:
+        return True
+    message = response.text.lower()
+    return 'too long' in message or 'too many clauses' in message
+
+
+def _clean_field(value: Optional[str]) -> str:
+    """
+    Strip control characters, then surrounding whitespace, from a single TSV
+    field (the order the pyarrow path cleans columns in). Almost every field
+    is printable, so translate only runs when needed.
+    """
+    if not value:
+        return ''
+    if not value.isprintable():
+        value = value.translate(_CTRL_TABLE)
+    return value.strip()
+
+
+def _replace_invalid_utf8(stream: io.BufferedReader) -> Iterator[bytes]:
+    """
+    Re-encode a byte stream chunk by chunk with invalid UTF-8 replaced by
+    U+FFFD, as errors='replace' does, so every parser sees valid text.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    for chunk in iter(lambda: stream.read(_READ_BUFFER_SIZE), b''):
+        text = decoder.decode(chunk)
+        # An empty chunk would read as end of stream
+        if text:
+            yield text.encode('utf-8')
+    text = decoder.decode(b'', final=True)
+    if text:
+        yield text.encode('utf-8')
+
+
+class _ResponseStream(io.RawIOBase):
+    """
+    Minimal readable file object over the chunks of a streamed response.
+    """
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._pending = memoryview(b'')
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if not self._pending:
+            self._pending = memoryview(next(self._chunks, b''))
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+class ProteinColumns:
+    """
+    Column-oriented table of UniProt proteins: one list per field, where
+    position i in every list describes the same protein.
+    """
+    __slots__ = ('accession', 'entry_name', 'protein_name', 'pfam_refs', 'oma_refs', 'uniprot_status')
+
     def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, [])
+
+    def __len__(self) -> int:
+        return len(self.accession)
+
+    def append(self, accession: str, entry_name: str, protein_name: str,
+               pfam_refs: str, oma_refs: str, uniprot_status: str):
+        self.accession.append(accession)
+        self.entry_name.append(entry_name)
+        self.protein_name.append(protein_name)
+        self.pfam_refs.append(pfam_refs)
+        self.oma_refs.append(oma_refs)
+        self.uniprot_status.append(uniprot_status)
+
+    def take(self, indices: List[int]) -> 'ProteinColumns':
+        """
+        Return a new table with only the rows at the given positions.
+        """
+        subset = ProteinColumns()
+        for name in self.__slots__:
+            column = getattr(self, name)
+            setattr(subset, name, [column[i] for i in indices])
+        return subset
+
+
+class FastPfamOMAAnalyzer:
+    def __init__(self, max_workers: int = 16, use_compression: bool = True):
     
         self.uniprot_base_url = "https://rest.uniprot.org"
-        self.request_delay = 0.1  # Small delay to be respectful
-    def get_oma_proteins(self, oma_fingerprint: Optional[str] = None, pfam_id: Optional[str] = None, in_pfam: bool = True) -> Tuple[List[Dict], Set[str]]:
+        self.request_delay = 0.1  # Minimum spacing between requests, shared by all workers
+        self.max_workers = max_workers
+        # Turn off on fast links where gzip decoding costs more than the transfer it saves
+        self.use_compression = use_compression
+
+        # One pooled session so workers reuse TCP/TLS connections
+        self.session = requests.Session()
+        # Never fewer pooled connections than workers, or extra workers would
+        # wait on the pool instead of keeping requests in flight
+        pool_size = max(32, max_workers)
+        # Transient UniProt errors and throttling are retried with exponential
+        # backoff, waiting as long as a 429's Retry-After header asks
+        retries = Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                        respect_retry_after_header=True)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+        self.session.mount('https://', adapter)
+
+        self._rate_lock = threading.Lock()
+        self._next_request_time = 0.0
+
+    def _wait_for_rate_limit(self):
+        """
+        Block until the shared rate limit allows another request to be sent.
+        """
+        with self._rate_lock:
+            now = time.monotonic()
+            wait = self._next_request_time - now
+            self._next_request_time = max(now, self._next_request_time) + self.request_delay
+
+        if wait > 0:
+            time.sleep(wait)
+
+    def _open_tsv_stream(self, response: requests.Response) -> io.BufferedReader:
+        """
+        Wrap a streamed UniProt response as a decompressed binary stream.
+        Content-Encoding is decoded by urllib3; a gzip file body (e.g. a
+        server that ignores content negotiation) is detected and unwrapped here.
+        """
+        chunks = response.iter_content(chunk_size=_READ_BUFFER_SIZE)
+        raw = io.BufferedReader(_ResponseStream(chunks), buffer_size=_READ_BUFFER_SIZE)
+
+        if raw.peek(2)[:2] == b'\x1f\x8b':
+            raw = io.BufferedReader(gzip.GzipFile(fileobj=raw), buffer_size=_READ_BUFFER_SIZE)
+
+        return raw
+
+    def _read_tsv_rows(self, stream: io.BufferedReader) -> Iterator[Tuple[str, ...]]:
+        """
+        Yield one tuple per TSV row, with fields in _TSV_COLUMNS order and
+        already cleaned as by _clean_field. Uses pyarrow's multithreaded C
+        parser and vectorized string kernels when available, csv otherwise.
+
+        Both parsers give the same rows: quotes are ordinary characters,
+        invalid UTF-8 is replaced, and rows with more or fewer fields than
+        the header are skipped.
+        """
+        if not stream.peek(1):
+            return
+
+        # Invalid UTF-8 would make pyarrow fail the whole block (even in the
+        # invalid row handler), so it is replaced before either parser runs
+        stream = io.BufferedReader(_ResponseStream(_replace_invalid_utf8(stream)), buffer_size=_READ_BUFFER_SIZE)
+        skipped_rows = []
+
+        def skip_row(row):
+            # Ragged rows (a stray tab or a truncated line) are dropped
+            # instead of failing the whole download
+            skipped_rows.append(row.number)
+            return 'skip'
+
+        parse_options = None
+        if pa_csv is not None:
+            try:
+                parse_options = pa_csv.ParseOptions(delimiter='\t', quote_char=False, invalid_row_handler=skip_row)
+            except TypeError:
+                # pyarrow < 7 can't skip ragged rows; use the csv path instead
+                pass
+
+        if parse_options is not None:
+            reader = pa_csv.open_csv(
+                stream,
+                read_options=pa_csv.ReadOptions(block_size=_READ_BUFFER_SIZE),
+                parse_options=parse_options,
+                convert_options=pa_csv.ConvertOptions(
+                    column_types=dict.fromkeys(_TSV_COLUMNS, pa.string()),
+                    include_columns=list(_TSV_COLUMNS),
+                    include_missing_columns=True,
+                    strings_can_be_null=False
+                )
+            )
+            for batch in reader:
+                # Clean each column in one kernel call instead of per field in Python
+                columns = [pc.utf8_trim_whitespace(pc.replace_substring_regex(
+                               pc.fill_null(column, ''), pattern=_CTRL_PATTERN, replacement=''))
+                           for column in batch.columns]
+                yield from zip(*(column.to_pylist() for column in columns))
+
+        else:
+            text = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+            # csv rejects NUL bytes on older Pythons; only the rare lines holding one are copied
+            lines = (line.replace('\x00', '') if '\x00' in line else line for line in text)
+            reader = csv.reader(lines, delimiter='\t', quoting=csv.QUOTE_NONE)
+
+            # Map each wanted column to its position once. An absent column
+            # gets a position past any row, so it always yields ''.
+            header = next(reader, [])
+            width = len(header)
+            positions = [header.index(name) if name in header else sys.maxsize for name in _TSV_COLUMNS]
+            clean_field = _clean_field
+            for row in reader:
+                size = len(row)
+                if size != width:
+                    # Blank lines are ignored, as pyarrow does
+                    if size:
+                        skipped_rows.append(reader.line_num)
+                    continue
+                yield tuple([clean_field(row[i]) if i < size else '' for i in positions])
+
+        if skipped_rows:
+            logger.warning(f"Skipped {len(skipped_rows)} malformed TSV rows")
+
+    def get_oma_proteins(self, oma_fingerprint: Optional[str] = None, pfam_id: Optional[str] = None) -> Tuple[ProteinColumns, Set[str], Dict[str, int]]:
         
         """
         Unified function to get proteins based on OMA fingerprint and/or Pfam domain,
         with UniProt status (Swiss-Prot or TrEMBL) included.
 
+        Proteins outside the Pfam are never queried with NOT; callers fetch the
+        whole OMA group and subtract the Pfam accessions client-side.
+
         Returns:
-            Tuple of (protein_data_list, oma_fingerprints_set)
+            Tuple of (protein_columns, oma_fingerprints_set, oma_fingerprint_counts)
         """
         query_parts = []
 
@@ -51,155 +318,174 @@ class FastPfamOMAAnalyzer:
             query_parts.append(f"xref:oma-{oma_fingerprint}")
 
         if pfam_id:
-            if in_pfam:
-                query_parts.append(pfam_id)
-                operation = "AND"
-            else:
-                query_parts.append(f"NOT {pfam_id}")
-                operation = "AND"
+            query_parts.append(pfam_id)
+
+        query = f"({query_parts[0]})" if len(query_parts) == 1 else f"({query_parts[0]}) AND {query_parts[1]}"
+
+        try:
+            # A partial Pfam download would make real members look unique
+            # to OMA, so only group downloads may stop early
+            proteins, oma_counts = self._stream_proteins(query, allow_partial=pfam_id is None)
+            return proteins, set(oma_counts), oma_counts
 
-        query = f"({query_parts[0]})" if len(query_parts) == 1 else f"({query_parts[0]}) {operation} {query_parts[1]}"
+        except requests.RequestException as e:
+            logger.error(f"Error fetching proteins: {e}")
+            return ProteinColumns(), set(), {}
+        except Exception as e:
+            logger.error(f"Error parsing protein data: {e}")
+            return ProteinColumns(), set(), {}
 
+    def _stream_proteins(self, query: str, allow_partial: bool = False) -> Tuple[ProteinColumns, Dict[str, int]]:
+        """
+        Run a UniProt /stream query and parse the TSV rows as they arrive.
+        Request and parsing errors are left to the caller, except that with
+        allow_partial a parsing error ends the download with the rows so far.
+        """
         url = f"{self.uniprot_base_url}/uniprotkb/stream"
         params = {
-            'compressed': 'true',
             'fields': 'accession,id,protein_name,xref_pfam,xref_oma,reviewed',
             'format': 'tsv',
             'query': query
             }
-
-        try:
-            response = requests.get(url, params=params, stream=True, timeout=60)
+        # Compression is negotiated with Accept-Encoding rather than compressed=true,
+        # so urllib3 decodes chunks as they arrive and can pick brotli or zstd
+        # (when those packages are installed) over gzip
+        if self.use_compression:
+            headers = None
+        else:
+            params['compressed'] = 'false'
+            headers = {'Accept-Encoding': 'identity'}
+
+        self._wait_for_rate_limit()
+        with self.session.get(url, params=params, headers=headers, stream=True, timeout=60) as response:
+            if response.status_code >= 400:
+                # Error bodies are short; read it while the stream is open so
+                # callers can still check the message with _query_rejected
+                response.content
             response.raise_for_status()
 
-            content = None
-            if response.headers.get('content-encoding') == 'gzip':
-                try:
-                    content = gzip.decompress(response.content).decode('utf-8', errors='replace')
-                except Exception:
-                    params['compressed'] = 'false'
-                    response = requests.get(url, params=params, stream=True, timeout=60)
-                    response.raise_for_status()
-                    content = response.text
-            else:
-                content = response.text
-
-            content = content.replace('\x00', '').replace('\r', '')
-            content = ''.join(c for c in content if c.isprintable() or c in '\t\n')
+            proteins = ProteinColumns()
+            oma_counts = {}
 
-            if not content.strip():
-                return [], set()
+            # Parse rows as they arrive instead of buffering the whole body
+            rows = self._read_tsv_rows(self._open_tsv_stream(response))
 
-            proteins = []
-            oma_fingerprints = set()
+            # Bind the per-row callables once; this loop runs for every row
+            add_protein = proteins.append
+            find_omas = _OMA_RE.finditer
+            get_count = oma_counts.get
+            # Rows of one family mostly repeat the same Pfam/OMA ref strings;
+            # keep one shared copy of each
+            shared_ref = {}.setdefault
 
+            # Rows always have every column (missing ones come back as
+            # ''), so the loop needs no per-row exception handling
             try:
-                csv_reader = csv.DictReader(StringIO(content), delimiter='\t')
-
-                for row_num, row in enumerate(csv_reader, 1):
-                    try:
-                        accession = row.get('Entry', '').strip()
-                        entry_name = row.get('Entry Name', '').strip()
-                        protein_name = row.get('Protein names', '').strip()
-                        pfam_refs = row.get('Pfam', '').strip()
-                        oma_refs = row.get('OMA', '').strip()
-                        reviewed = row.get('Reviewed', '').strip().lower()
-                        uniprot_status = "Swiss-Prot" if reviewed == "reviewed" else "TrEMBL"
-
-                        if not accession:
-                            continue
-
-                        protein_data = {
-                            'accession': accession,
-                            'entry_name': entry_name,
-                            'protein_name': protein_name,
-                            'pfam_refs': pfam_refs,
-                            'oma_refs': oma_refs,
-                            'uniprot_status': uniprot_status
-                        }
-
-                        proteins.append(protein_data)
-
-                        if oma_refs:
-                            oma_matches = re.findall(r'[A-Z]{7}', oma_refs)
-                            oma_fingerprints.update(oma_matches)
-
-                    except Exception as e:
-                        logger.debug(f"Error processing row {row_num}: {e}")
+                for row in rows:
+                    accession, entry_name, protein_name, pfam_refs, oma_refs, reviewed = row
+
+                    if not accession:
                         continue
 
-            except csv.Error as e:
-                logger.error(f"CSV parsing error: {e}")
-                lines = content.split('\n')
-                if len(lines) > 1:
-                    for line_num, line in enumerate(lines[1:], 2):
-                        try:
-                            if line.strip():
-                                parts = line.split('\t')
-                                if len(parts) >= 1 and parts[0].strip():
-                                    accession = parts[0].strip()
-                                    oma_refs = parts[4].strip() if len(parts) > 4 else ''
-                                    reviewed = parts[5].strip().lower() if len(parts) > 5 else ''
-                                    uniprot_status = "Swiss-Prot" if reviewed == "reviewed" else "TrEMBL"
-
-                                    proteins.append({
-                                        'accession': accession,
-                                        'entry_name': parts[1].strip() if len(parts) > 1 else '',
-                                        'protein_name': parts[2].strip() if len(parts) > 2 else '',
-                                        'pfam_refs': parts[3].strip() if len(parts) > 3 else '',
-                                        'oma_refs': oma_refs,
-                                        'uniprot_status': uniprot_status
-                                    })
-
-                                    if oma_refs:
-                                        oma_matches = re.findall(r'[A-Z]{7}', oma_refs)
-                                        oma_fingerprints.update(oma_matches)
-                        except Exception as e:
-                            logger.debug(f"Error processing line {line_num}: {e}")
-                            continue
-
-            return proteins, oma_fingerprints
+                    pfam_refs = shared_ref(pfam_refs, pfam_refs)
+                    oma_refs = shared_ref(oma_refs, oma_refs)
 
-        except requests.RequestException as e:
-            logger.error(f"Error fetching proteins: {e}")
-            return [], set()
-        except Exception as e:
-            logger.error(f"Error parsing protein data: {e}")
-            if 'content' in locals() and content:
-                logger.debug(f"Content preview (first 200 chars): {repr(content[:200])}")
-            return [], set()
+                    uniprot_status = "Swiss-Prot" if reviewed.lower() == "reviewed" else "TrEMBL"
+                    add_protein(accession, entry_name, protein_name, pfam_refs, oma_refs, uniprot_status)
+
+                    # Tally in place rather than building a match list per row
+                    for match in find_omas(oma_refs):
+                        oma_fingerprint = match.group()
+                        oma_counts[oma_fingerprint] = get_count(oma_fingerprint, 0) + 1
+
+            except _TSV_ERRORS as e:
+                if not allow_partial:
+                    raise
+                # The stream cannot be rewound, so keep the rows parsed so far
+                logger.error(f"CSV parsing error after {len(proteins)} rows: {e}")
+
+        return proteins, oma_counts
+
+    def get_oma_proteins_bulk(self, oma_fingerprints: List[str]) -> Dict[str, ProteinColumns]:
+        """
+        Fetch several whole OMA groups with a single OR query and split the
+        rows back out by fingerprint. Request errors are left to the caller.
+        """
+        query = "(" + " OR ".join(f"xref:oma-{oma_fingerprint}" for oma_fingerprint in oma_fingerprints) + ")"
+        proteins, _ = self._stream_proteins(query, allow_partial=True)
+
+        positions = {oma_fingerprint: [] for oma_fingerprint in oma_fingerprints}
+        # Bound once; the loop runs for every row of the batch
+        find_omas = _OMA_RE.findall
+        wanted = set(oma_fingerprints).intersection
+        for i, oma_refs in enumerate(proteins.oma_refs):
+            for oma_fingerprint in wanted(find_omas(oma_refs)):
+                positions[oma_fingerprint].append(i)
+
+        return {oma_fingerprint: proteins.take(group_positions)
+                for oma_fingerprint, group_positions in positions.items()}
 
    
 
-    def get_total_oma_group_size(self, oma_fingerprint: str) -> int:
+    def _process_oma_group(self, oma_fingerprint: str, pfam_count: int, pfam_accessions: Set[str]) -> Tuple[str, Dict]:
         """
-        Get the total number of proteins in an OMA group.
+        Fetch the proteins unique to one OMA group and its total size.
+        Runs in a worker thread; returns (oma_fingerprint, group_data).
         """
-        logger.debug(f"Getting total size for OMA group {oma_fingerprint}")
-        
-        url = f"{self.uniprot_base_url}/uniprotkb/search"
-        params = {
-            'query': f'(xref:oma-{oma_fingerprint})',
-            'format': 'json',
-            'size': '1'  # We only need the count
-        }
+        logger.info(f"Processing OMA group {oma_fingerprint} ({pfam_count} in Pfam)")
         
+        oma_proteins, _, _ = self.get_oma_proteins(oma_fingerprint=oma_fingerprint)
+        return oma_fingerprint, self._summarize_oma_group(oma_fingerprint, oma_proteins, pfam_count, pfam_accessions)
+
+    def _process_oma_batch(self, batch: List[Tuple[str, int]], pfam_accessions: Set[str]) -> List[Tuple[str, Dict]]:
+        """
+        Fetch a batch of frequent OMA groups with one bulk query. If UniProt
+        rejects the query (e.g. as too long), the batch is split in half and
+        each half retried, down to one query per group. Other failures leave
+        the batch's groups empty.
+        Runs in a worker thread; returns a list of (oma_fingerprint, group_data).
+        """
+        if len(batch) == 1:
+            oma_fingerprint, pfam_count = batch[0]
+            return [self._process_oma_group(oma_fingerprint, pfam_count, pfam_accessions)]
+
+        logger.info(f"Processing {len(batch)} OMA groups in one query")
+
         try:
-            response = requests.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            total_count = data.get('count', 0)
-            
-            logger.debug(f"OMA group {oma_fingerprint} has {total_count} total members")
-            return total_count
-            
-        except requests.RequestException as e:
-            logger.error(f"Error getting OMA group size for {oma_fingerprint}: {e}")
-            return 0
+            groups = self.get_oma_proteins_bulk([oma_fingerprint for oma_fingerprint, _ in batch])
         except Exception as e:
-            logger.error(f"Error parsing OMA group size for {oma_fingerprint}: {e}")
-            return 0
+            if not (isinstance(e, requests.HTTPError) and _query_rejected(e.response)):
+                # Timeouts, connection errors and 5xx responses were already
+                # retried by the adapter; splitting would only multiply them
+                logger.error(f"Bulk query for {len(batch)} OMA groups failed: {e}")
+                return [(oma_fingerprint, self._summarize_oma_group(oma_fingerprint, ProteinColumns(), pfam_count, pfam_accessions))
+                        for oma_fingerprint, pfam_count in batch]
+
+            logger.warning(f"UniProt rejected the bulk query for {len(batch)} OMA groups, splitting the batch: {e}")
+            middle = len(batch) // 2
+            return (self._process_oma_batch(batch[:middle], pfam_accessions) +
+                    self._process_oma_batch(batch[middle:], pfam_accessions))
+
+        return [(oma_fingerprint, self._summarize_oma_group(oma_fingerprint, groups[oma_fingerprint], pfam_count, pfam_accessions))
+                for oma_fingerprint, pfam_count in batch]
+
+    def _summarize_oma_group(self, oma_fingerprint: str, oma_proteins: ProteinColumns,
+                             pfam_count: int, pfam_accessions: Set[str]) -> Dict:
+        """
+        Build the per-group result from every protein in the OMA group; its
+        size and the proteins lacking the Pfam domain come from the same rows.
+        Membership in the Pfam is a set lookup on the accessions from Step 1.
+        """
+        total_oma_size = len(oma_proteins)
+        oma_only_proteins = oma_proteins.take(
+            [i for i, accession in enumerate(oma_proteins.accession) if accession not in pfam_accessions])
+        
+        return {
+            'pfam_count': pfam_count,
+            'total_oma_size': total_oma_size,
+            'unique_proteins': oma_only_proteins,
+            'unique_count': len(oma_only_proteins)
+        }
 
     def analyze_pfam_family(self, pfam_id: str, min_count: int = 3) -> Dict:
         """
@@ -208,12 +494,13 @@ class FastPfamOMAAnalyzer:
         logger.info(f"Starting fast analysis of Pfam family {pfam_id}")
         
         # Validate Pfam ID format
-        if not re.match(r'^PF\d{5}$', pfam_id):
+        if not _valid_pfam(pfam_id):
             logger.error(f"Invalid Pfam ID format: {pfam_id}. Expected format: PF#####")
             return {}
         
         # Step 1: Get all proteins with this Pfam domain and their OMA fingerprints
-        pfam_proteins, oma_fingerprints = self.get_oma_proteins(pfam_id=pfam_id)
+        # The OMA fingerprint counts are tallied while the rows are parsed
+        pfam_proteins, oma_fingerprints, oma_counts = self.get_oma_proteins(pfam_id=pfam_id)
         
         if not pfam_proteins:
             logger.error(f"No proteins found for Pfam {pfam_id}")
@@ -224,58 +511,45 @@ class FastPfamOMAAnalyzer:
             return {
                 'pfam_id': pfam_id,
                 'pfam_protein_count': len(pfam_proteins),
-                'pfam_proteins': pfam_proteins,
                 'oma_fingerprints': {},
                 'unique_to_oma': {},
                 'unique_to_oma_count': 0
             }
         
-        # Step 2: Count occurrences of each OMA fingerprint in the Pfam
-        oma_counts = Counter()
-        pfam_accessions = set()
-        
-        for protein in pfam_proteins:
-            pfam_accessions.add(protein['accession'])
-            if protein['oma_refs']:
-                oma_matches = re.findall(r'[A-Z]{7}', protein['oma_refs'])
-                oma_counts.update(oma_matches)
+        # Step 2: Collect the accessions already in the Pfam
+        pfam_accessions = set(pfam_proteins.accession)
+        pfam_protein_count = len(pfam_proteins)
         
         # Step 3: Filter OMA groups by minimum count
         frequent_omas = {oma: count for oma, count in oma_counts.items() 
                         if count >= min_count}
         
         logger.info(f"Found {len(frequent_omas)} OMA groups with at least {min_count} occurrences")
+
+        # Groups are fetched in batches of OR-ed fingerprints, one query per batch
+        oma_items = iter(frequent_omas.items())
+        batches = list(iter(lambda: list(islice(oma_items, _OMA_BATCH_SIZE)), []))
+
+        # Only the accessions and counts are needed from here on, so the full
+        # rows are released before the Step 4 downloads
+        del pfam_proteins
         
-        # Step 4: For each frequent OMA group, find proteins not in the Pfam
+        # Step 4: For each frequent OMA group, find proteins not in the Pfam.
         unique_to_oma = {}
         total_unique_count = 0
         
-        for oma_fingerprint, pfam_count in frequent_omas.items():
-            logger.info(f"Processing OMA group {oma_fingerprint} ({pfam_count} in Pfam)")
-            
-            # Get proteins with this OMA fingerprint that don't have the Pfam domain
-            oma_only_proteins, _ = self.get_oma_proteins(oma_fingerprint=oma_fingerprint, pfam_id=pfam_id, in_pfam=False)
-            
-            # Get total OMA group size
-            total_oma_size = self.get_total_oma_group_size(oma_fingerprint)
-            
-            unique_to_oma[oma_fingerprint] = {
-                'pfam_count': pfam_count,
-                'total_oma_size': total_oma_size,
-                'unique_proteins': oma_only_proteins,
-                'unique_count': len(oma_only_proteins)
-            }
-            
-            total_unique_count += len(oma_only_proteins)
-            
-            # Small delay to be respectful
-            time.sleep(self.request_delay)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._process_oma_batch, batch, pfam_accessions) for batch in batches]
+
+            for future in as_completed(futures):
+                for oma_fingerprint, oma_data in future.result():
+                    unique_to_oma[oma_fingerprint] = oma_data
+                    total_unique_count += oma_data['unique_count']
         
         results = {
             'pfam_id': pfam_id,
             'min_count': min_count,
-            'pfam_protein_count': len(pfam_proteins),
-            'pfam_proteins': pfam_proteins,
+            'pfam_protein_count': pfam_protein_count,
             'oma_fingerprints': dict(frequent_omas),
             'unique_to_oma': unique_to_oma,
             'unique_to_oma_count': total_unique_count,
@@ -285,72 +559,83 @@ class FastPfamOMAAnalyzer:
         logger.info(f"Analysis complete. Found {total_unique_count} proteins unique to OMA groups")
         return results
 
-    def generate_report(self, results: Dict, output_file: str = "report.txt") -> str:
+    def generate_report(self, results: Dict, output_file: str = "report.txt", compress: bool = False) -> str:
         """
         Generate a comprehensive report of the analysis and write directly to file,
         including UniProt status (Swiss-Prot or TrEMBL) for each protein.
+        With compress=True the report is gzipped at level 1 (fast, still much smaller).
         """
         if not results:
             return "No results to report."
 
         try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                # Write header
-                f.write("="*80 + "\n")
-                f.write("FAST PFAM-OMA ORTHOLOG ANALYSIS REPORT\n")
-                f.write("="*80 + "\n")
-                f.write(f"Pfam Family: {results['pfam_id']}\n")
-                f.write(f"Minimum Count Threshold: {results['min_count']}\n")
-                f.write(f"Analysis Date: {results.get('analysis_timestamp', 'Unknown')}\n")
-                f.write("\n")
-
-                # Summary statistics
-                f.write("SUMMARY STATISTICS\n")
-                f.write("-" * 50 + "\n")
-                f.write(f"Total proteins in Pfam family: {results['pfam_protein_count']}\n")
-                f.write(f"OMA groups with >={results['min_count']} occurrences: {len(results['oma_fingerprints'])}\n")
-                f.write(f"Proteins unique to OMA groups: {results['unique_to_oma_count']}\n")
-                f.write("\n")
+            # Large write buffer; each section is assembled as a list of lines
+            # and handed to writelines in one call
+            if compress:
+                report_file = io.TextIOWrapper(
+                    io.BufferedWriter(gzip.open(output_file, 'wb', compresslevel=1), buffer_size=1 << 20),
+                    encoding='utf-8')
+            else:
+                report_file = open(output_file, 'w', encoding='utf-8', buffering=1 << 20)
+
+            with report_file as f:
+                # Header and summary statistics
+                f.writelines([
+                    "=" * 80 + "\n",
+                    "FAST PFAM-OMA ORTHOLOG ANALYSIS REPORT\n",
+                    "=" * 80 + "\n",
+                    f"Pfam Family: {results['pfam_id']}\n",
+                    f"Minimum Count Threshold: {results['min_count']}\n",
+                    f"Analysis Date: {results.get('analysis_timestamp', 'Unknown')}\n",
+                    "\n",
+                    "SUMMARY STATISTICS\n",
+                    "-" * 50 + "\n",
+                    f"Total proteins in Pfam family: {results['pfam_protein_count']}\n",
+                    f"OMA groups with >={results['min_count']} occurrences: {len(results['oma_fingerprints'])}\n",
+                    f"Proteins unique to OMA groups: {results['unique_to_oma_count']}\n",
+                    "\n"
+                ])
 
                 # Frequent OMA groups
                 if results['oma_fingerprints']:
-                    f.write(f"FREQUENT OMA GROUPS (>={results['min_count']} occurrences)\n")
-                    f.write("-" * 50 + "\n")
+                    out = [f"FREQUENT OMA GROUPS (>={results['min_count']} occurrences)\n", "-" * 50 + "\n"]
 
-                    sorted_omas = sorted(results['oma_fingerprints'].items(), key=lambda x: x[1], reverse=True)
+                    sorted_omas = sorted(results['oma_fingerprints'].items(), key=itemgetter(1), reverse=True)
                     for oma_fingerprint, pfam_count in sorted_omas:
                         oma_data = results['unique_to_oma'].get(oma_fingerprint, {})
                         total_size = oma_data.get('total_oma_size', 0)
                         unique_count = oma_data.get('unique_count', 0)
-                        f.write(f"{oma_fingerprint}: {pfam_count} in Pfam, {total_size} total in OMA, {unique_count} unique to OMA\n")
-                    f.write("\n")
+                        out.append(f"{oma_fingerprint}: {pfam_count} in Pfam, {total_size} total in OMA, {unique_count} unique to OMA\n")
+                    out.append("\n")
+                    f.writelines(out)
 
                 # Unique proteins section
                 if results['unique_to_oma_count'] > 0:
-                    f.write("PROTEINS UNIQUE TO OMA GROUPS (Not in Pfam)\n")
-                    f.write("-" * 50 + "\n")
+                    f.write("PROTEINS UNIQUE TO OMA GROUPS (Not in Pfam)\n" + "-" * 50 + "\n")
 
                     for oma_fingerprint in sorted(results['unique_to_oma'].keys()):
                         oma_data = results['unique_to_oma'][oma_fingerprint]
                         unique_proteins = oma_data['unique_proteins']
 
                         if unique_proteins:
-                            f.write(f"OMA GROUP: {oma_fingerprint}\n")
-                            f.write("=" * 60 + "\n")
-
-                            sorted_proteins = sorted(unique_proteins, key=lambda x: x['accession'])
-                            for protein in sorted_proteins:
-                                accession = protein['accession']
-                                protein_name = protein['protein_name'][:80] + "..." if len(protein['protein_name']) > 80 else protein['protein_name']
-                                status = protein.get('uniprot_status', 'unknown')
-                                f.write(f"      {accession} | {protein_name} | status: {status}\n")
-
-                            f.write("\n")
+                            out = [f"OMA GROUP: {oma_fingerprint}\n", "=" * 60 + "\n"]
+
+                            # Sort row positions by accession rather than building row objects
+                            order = sorted(range(len(unique_proteins)), key=unique_proteins.accession.__getitem__)
+                            for i in order:
+                                accession = unique_proteins.accession[i]
+                                protein_name = unique_proteins.protein_name[i]
+                                protein_name = protein_name[:80] + "..." if len(protein_name) > 80 else protein_name
+                                status = unique_proteins.uniprot_status[i] or 'unknown'
+                                out.append(f"      {accession} | {protein_name} | status: {status}\n")
+
+                            out.append("\n")
+                            f.writelines(out)
                 else:
                     f.write("No proteins found that are unique to OMA groups.\n\n")
 
                 # Footer
-                f.write("="*80 + "\n")
+                f.write("=" * 80 + "\n")
 
             logger.info(f"Report saved to {output_file}")
             return f"Report successfully written to {output_file}"
@@ -370,6 +655,12 @@ def main():
                        help="Output file for the report (default: report.txt)")
     parser.add_argument("--min-count", "-c", type=int, default=3, 
                        help="Minimum count threshold for OMA groups (default: 3)")
+    parser.add_argument("--workers", "-w", type=int, default=16,
+                       help="Number of concurrent UniProt requests (default: 16)")
+    parser.add_argument("--no-compression", action="store_true",
+                       help="Download UniProt results uncompressed (faster on high-bandwidth links)")
+    parser.add_argument("--gzip-report", action="store_true",
+                       help="Write the report gzip-compressed (adds .gz to the output name)")
     parser.add_argument("--verbose", "-v", action="store_true", 
                        help="Enable verbose logging")
 
@@ -379,19 +670,23 @@ def main():
         logging.getLogger().setLevel(logging.DEBUG)
 
     # Validate Pfam ID format
-    if not re.match(r'^PF\d{5}$', args.pfam_id):
+    if not _valid_pfam(args.pfam_id):
         logger.error(f"Invalid Pfam ID format: {args.pfam_id}. Expected format: PF##### (e.g., PF10181)")
         sys.exit(1)
 
     try:
-        analyzer = FastPfamOMAAnalyzer()
+        analyzer = FastPfamOMAAnalyzer(max_workers=args.workers, use_compression=not args.no_compression)
         results = analyzer.analyze_pfam_family(args.pfam_id, min_count=args.min_count)
         
         if not results:
             logger.error("Analysis failed - no results generated")
             sys.exit(1)
 
-        report_status = analyzer.generate_report(results, args.output)
+        output_file = args.output
+        if args.gzip_report and not output_file.endswith('.gz'):
+            output_file += '.gz'
+
+        report_status = analyzer.generate_report(results, output_file, compress=args.gzip_report)
         print(f"\nAnalysis complete! {report_status}")
         
         # Print summary to console
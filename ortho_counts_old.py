@@ -15,25 +15,190 @@ import json
 from collections import Counter
 import argparse
 import logging
-from typing import Dict, List, Set, Tuple, Optional
+from typing import Dict, List, Set, FrozenSet, Tuple, Optional
 import re
 import os
+import mmap
+import threading
+import sqlite3
+import pickle
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 except ImportError:
     print("Error: 'requests' module is required but not installed.")
     print("Please install it using: pip3 install requests")
     sys.exit(1)
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# UniProt accessions looked up per search request (the UniProt page-size limit is 500)
+_UNIPROT_BATCH_SIZE = 100
+# Protein IDs sent per OMA bulk_retrieve request (the most the OMA API accepts)
+_OMA_BATCH_SIZE = 100
+
+# Per-accession results kept on disk between runs
+_KV_CACHE_FILE = '.oma_cache.sqlite'
+_KV_EXPIRE_SECONDS = 86400
+
+# Kingdoms by taxon ID prefix, looked up longest prefix first; other IDs
+# starting with '2' are counted as Bacteria
+_KINGDOM_PREFIX = {
+    '2157': "Archaea",
+    '33208': "Metazoa",
+    '33090': "Viridiplantae",
+    '4751': "Fungi",
+    '554915': "Amoebozoa",
+    '2763': "Rhodophyta",
+    '3027': "Cryptophyta",
+    '5878': "Ciliophora",
+    '5747': "Apicomplexa",
+    '207245': "Diplomonadida",
+    '2759': "Other Eukaryota",
+}
+_KINGDOM_PREFIX_LENGTHS = sorted({len(prefix) for prefix in _KINGDOM_PREFIX}, reverse=True)
+
+# Patterns used per line or per response, compiled once
+_UNIPROT_RE = re.compile(r'^[A-Z0-9]{6,10}$')
+_PFAM_RE = re.compile(r'^PF\d{5}$')
+# OMA group fingerprints (group numbers are plain integers)
+_FINGERPRINT_RE = re.compile(r'^[A-Z]{7}$')
+# The UniProt accession (version dropped) in the second column of each
+# non-comment line of a Pfam scores file
+_SCORES_RE = re.compile(rb'^[ \t\f\v\r]*(?!#)\S+[ \t\f\v\r]+([A-Z0-9]{6,10})(?![^.\s])', re.MULTILINE)
+
+class _ResultsUnpickler(pickle.Unpickler):
+    """
+    Unpickler for saved analysis results. These hold only built-in
+    containers, strings and numbers, so loading any class or function (which
+    is how a crafted pickle runs code) is refused.
+    """
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"saved results may not contain {module}.{name}")
+
 class PfamOMAAnalyzer:
-    def __init__(self):
+    def __init__(self, max_workers: int = 8, use_cache: bool = True):
         self.oma_base_url = "https://omabrowser.org/api/"
         self.uniprot_base_url = "https://rest.uniprot.org"
-        self.request_delay = 0.2  # Increased delay to be more respectful to APIs
+        self.request_delay = 0.0  # Minimum spacing between requests, shared by all workers; raised on HTTP 429
+        self.max_workers = max_workers
+        self.use_cache = use_cache
+
+        # One pooled session so workers reuse TCP/TLS connections to OMA and
+        # UniProt. Throttled and failing requests back off exponentially (with
+        # jitter where urllib3 supports it), waiting at least as long as
+        # Retry-After. The final response is returned rather than raised, so a
+        # lasting 429 reaches _note_rate_limit below.
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': 'find_orthos/1.0'})
+        retry_options = dict(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                             respect_retry_after_header=True, raise_on_status=False)
+        try:
+            retries = Retry(backoff_jitter=0.5, **retry_options)
+        except TypeError:
+            retries = Retry(**retry_options)
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=max(32, max_workers), max_retries=retries)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._rate_lock = threading.Lock()
+        self._next_request_time = 0.0
+        self.session.hooks['response'].append(self._note_rate_limit)
+
+        # OMA groups and descriptions are kept per accession for a day, so
+        # re-runs and repeated IDs don't fetch them again.
+        self._kv = None
+        self._kv_lock = threading.Lock()
+        if use_cache:
+            try:
+                self._kv = sqlite3.connect(_KV_CACHE_FILE, check_same_thread=False)
+                with self._kv:
+                    self._kv.execute("CREATE TABLE IF NOT EXISTS kv "
+                                     "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)")
+            except sqlite3.Error as e:
+                logger.warning(f"Could not open result cache {_KV_CACHE_FILE}: {e}")
+                self._kv = None
+
+    def _wait_for_rate_limit(self):
+        """
+        Block until the shared rate limit allows another request to be sent.
+        """
+        with self._rate_lock:
+            now = time.monotonic()
+            wait = self._next_request_time - now
+            self._next_request_time = max(now, self._next_request_time) + self.request_delay
+
+        if wait > 0:
+            time.sleep(wait)
+
+    def _note_rate_limit(self, response, *args, **kwargs):
+        """
+        Response hook for the shared rate limiter. When the server reports that
+        its X-RateLimit quota is used up, hold all requests until it resets;
+        when it is still answering 429 after the retries, space out all
+        further requests (doubling the delay, up to 5 seconds).
+        """
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset = response.headers.get('X-RateLimit-Reset')
+        if remaining == '0' and reset:
+            try:
+                reset = float(reset)
+            except ValueError:
+                reset = None
+            if reset is not None:
+                # The reset is either an epoch timestamp or a number of seconds
+                wait = reset - time.time() if reset > 1e9 else reset
+                wait = min(max(wait, 0.0), 60.0)
+                with self._rate_lock:
+                    self._next_request_time = max(self._next_request_time, time.monotonic() + wait)
+                logger.info(f"Rate limit of {response.url} used up; pausing requests for {wait:.1f}s")
+
+        if response.status_code == 429:
+            with self._rate_lock:
+                self.request_delay = min(max(2 * self.request_delay, 0.2), 5.0)
+            logger.warning(f"Throttled by {response.url}; spacing requests {self.request_delay:.1f}s apart")
+
+    def _kv_get(self, kind: str, key):
+        """
+        Return the unexpired cached result of the given kind, or None.
+        """
+        if self._kv is None:
+            return None
+
+        with self._kv_lock:
+            try:
+                row = self._kv.execute("SELECT value FROM kv WHERE key = ? AND expires > ?",
+                                       (f"{kind}:{key}", time.time())).fetchone()
+            except sqlite3.Error as e:
+                logger.debug(f"Result cache lookup failed: {e}")
+                return None
+        return _loads(row[0]) if row else None
+
+    def _kv_set(self, kind: str, key, value):
+        """
+        Cache a result of the given kind for _KV_EXPIRE_SECONDS. Empty results are
+        not stored, since they can come from a failed request.
+        """
+        if self._kv is None or not value or value == "Unknown":
+            return
+
+        with self._kv_lock:
+            try:
+                with self._kv:
+                    self._kv.execute("INSERT OR REPLACE INTO kv VALUES (?, ?, ?)",
+                                     (f"{kind}:{key}", json.dumps(value), time.time() + _KV_EXPIRE_SECONDS))
+            except sqlite3.Error as e:
+                logger.debug(f"Result cache update failed: {e}")
 
     def read_pfam_scores_file(self, pfam_folder: str) -> List[str]:
         scores_file = os.path.join(pfam_folder, "scores")
@@ -46,23 +211,12 @@ class PfamOMAAnalyzer:
         uniprot_ids = []
 
         try:
-            with open(scores_file, 'r') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    if not line or line.startswith('#'):
-                        continue
-
-                    parts = line.split()
-                    if len(parts) < 2:
-                        continue
-
-                    potential_uniprot = parts[1]
-                    uniprot_id = potential_uniprot.split('.')[0] if '.' in potential_uniprot else potential_uniprot
-
-                    if re.match(r'^[A-Z0-9]{6,10}$', uniprot_id):
-                        uniprot_ids.append(uniprot_id)
-                    else:
-                        logger.debug(f"Skipping invalid UniProt ID format on line {line_num}: {uniprot_id}")
+            # Scan the whole file with one compiled pattern; lines without a
+            # valid accession in the second column simply don't match
+            if os.path.getsize(scores_file):
+                with open(scores_file, 'rb') as f, \
+                        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    uniprot_ids = [uniprot_id.decode('ascii') for uniprot_id in _SCORES_RE.findall(data)]
         except Exception as e:
             logger.error(f"Error reading scores file: {e}")
             return []
@@ -72,7 +226,7 @@ class PfamOMAAnalyzer:
 
     def get_pfam_id_from_folder(self, pfam_folder: str) -> str:
         folder_name = os.path.basename(pfam_folder.rstrip('/'))
-        if re.match(r'^PF\d{5}$', folder_name):
+        if _PFAM_RE.match(folder_name):
             return folder_name
 
         desc_file = os.path.join(pfam_folder, "DESC")
@@ -82,37 +236,52 @@ class PfamOMAAnalyzer:
                     for line in f:
                         if line.startswith('AC '):
                             pfam_id = line.split()[1].rstrip(';')
-                            if re.match(r'^PF\d{5}$', pfam_id):
+                            if _PFAM_RE.match(pfam_id):
                                 return pfam_id
             except Exception as e:
                 logger.debug(f"Error reading DESC file: {e}")
 
         return folder_name
 
+    @staticmethod
+    def _description_from_entry(data: Dict) -> str:
+        """
+        Pick the protein description out of a UniProt JSON entry.
+        """
+        # Extract protein name/description
+        if 'proteinDescription' in data:
+            desc = data['proteinDescription']
+            if 'recommendedName' in desc and 'fullName' in desc['recommendedName']:
+                return desc['recommendedName']['fullName']['value']
+            elif 'submissionNames' in desc and desc['submissionNames']:
+                return desc['submissionNames'][0]['fullName']['value']
+
+        # Fallback to entry name
+        if 'uniProtkbId' in data:
+            return data['uniProtkbId']
+
+        return "Unknown"
+
     def get_uniprot_description(self, uniprot_id: str) -> str:
         """
-        Get the protein description from UniProt.
+        Get the protein description from UniProt, or from the result cache.
         """
+        description = self._kv_get('description', uniprot_id)
+        if description is None:
+            description = self._fetch_uniprot_description(uniprot_id)
+            self._kv_set('description', uniprot_id, description)
+        return description
+
+    def _fetch_uniprot_description(self, uniprot_id: str) -> str:
         try:
             url = f"{self.uniprot_base_url}/uniprotkb/{uniprot_id}"
-            params = {'format': 'json'}
-            response = requests.get(url, params=params, timeout=10)
+            params = {'format': 'json', 'fields': 'accession,id,protein_name'}
+            self._wait_for_rate_limit()
+            response = self.session.get(url, params=params, timeout=10)
             
             if response.status_code == 200:
-                data = response.json()
-                # Extract protein name/description
-                if 'proteinDescription' in data:
-                    desc = data['proteinDescription']
-                    if 'recommendedName' in desc and 'fullName' in desc['recommendedName']:
-                        return desc['recommendedName']['fullName']['value']
-                    elif 'submissionNames' in desc and desc['submissionNames']:
-                        return desc['submissionNames'][0]['fullName']['value']
-                
-                # Fallback to entry name
-                if 'uniProtkbId' in data:
-                    return data['uniProtkbId']
+                return self._description_from_entry(_loads(response.content))
                     
-            time.sleep(0.1)  # Small delay to respect API limits
             return "Unknown"
             
         except requests.RequestException as e:
@@ -122,47 +291,215 @@ class PfamOMAAnalyzer:
             logger.debug(f"Error parsing description for {uniprot_id}: {e}")
             return "Unknown"
 
+    def _get_descriptions(self, uniprot_ids: List[str]) -> Dict[str, str]:
+        """
+        Fetch the descriptions of up to _UNIPROT_BATCH_SIZE accessions with one
+        UniProt search. Accessions UniProt doesn't return are left out.
+        """
+        url = f"{self.uniprot_base_url}/uniprotkb/search"
+        params = {
+            'query': " OR ".join(f"accession:{uniprot_id}" for uniprot_id in uniprot_ids),
+            'fields': 'accession,id,protein_name',
+            'format': 'json',
+            'size': len(uniprot_ids)
+        }
+
+        try:
+            self._wait_for_rate_limit()
+            response = self.session.get(url, params=params, timeout=30)
+            response.raise_for_status()
+            data = _loads(response.content)
+        except (requests.RequestException, ValueError) as e:
+            logger.debug(f"Batch description lookup for {len(uniprot_ids)} UniProt IDs failed: {e}")
+            return {}
+
+        return {result['primaryAccession']: self._description_from_entry(result)
+                for result in data.get('results', [])}
+
+    def batch_get_descriptions(self, uniprot_ids: List[str]) -> Dict[str, str]:
+        """
+        Get the descriptions of many UniProt IDs, _UNIPROT_BATCH_SIZE per
+        request with several batches in flight. Cached descriptions are reused;
+        IDs missing from the batch answers are looked up one by one.
+        """
+        descriptions = {}
+        for uniprot_id in dict.fromkeys(uniprot_ids):
+            description = self._kv_get('description', uniprot_id)
+            if description is not None:
+                descriptions[uniprot_id] = description
+
+        unique_ids = [uniprot_id for uniprot_id in dict.fromkeys(uniprot_ids) if uniprot_id not in descriptions]
+        batches = [unique_ids[i:i + _UNIPROT_BATCH_SIZE] for i in range(0, len(unique_ids), _UNIPROT_BATCH_SIZE)]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for batch_descriptions in executor.map(self._get_descriptions, batches):
+                descriptions.update(batch_descriptions)
+                for uniprot_id, description in batch_descriptions.items():
+                    self._kv_set('description', uniprot_id, description)
+
+            missing_ids = [uniprot_id for uniprot_id in unique_ids if uniprot_id not in descriptions]
+            descriptions.update(zip(missing_ids, executor.map(self.get_uniprot_description, missing_ids)))
+
+        return descriptions
+
     def get_oma_fingerprint(self, uniprot_id: str) -> Optional[str]:
+        """
+        Get the OMA group of a UniProt ID, or take it from the result cache.
+        """
+        oma_id = self._kv_get('oma', uniprot_id)
+        if oma_id is None:
+            oma_id = self._fetch_oma_fingerprint(uniprot_id)
+            self._kv_set('oma', uniprot_id, oma_id)
+        return oma_id
+
+    def _fetch_oma_fingerprint(self, uniprot_id: str) -> Optional[str]:
         try:
             # First try the OMA API directly
             url = f"{self.oma_base_url}protein/{uniprot_id}/"
-            response = requests.get(url, timeout=10)
+            self._wait_for_rate_limit()
+            response = self.session.get(url, timeout=10)
 
             if response.status_code == 200:
-                data = response.json()
+                data = _loads(response.content)
                 if 'oma_group' in data and data['oma_group']:
                     return data['oma_group']
 
-            time.sleep(self.request_delay)
-            
-            # Fallback: scrape UniProt page for OMA links
-            uniprot_url = f"https://www.uniprot.org/uniprotkb/{uniprot_id}"
-            response = requests.get(uniprot_url, timeout=10)
+            # Fallback: the OMA cross-reference of the UniProt entry
+            uniprot_url = f"{self.uniprot_base_url}/uniprotkb/{uniprot_id}"
+            params = {'format': 'json', 'fields': 'xref_oma'}
+            self._wait_for_rate_limit()
+            response = self.session.get(uniprot_url, params=params, timeout=10)
 
             if response.status_code == 200:
-                oma_pattern = r'omabrowser\.org/oma/omagroup/([^/\s"]+)'
-                match = re.search(oma_pattern, response.text)
-                if match:
-                    return match.group(1)
+                return self._oma_xref_from_entry(_loads(response.content))
 
-        except requests.RequestException as e:
+        except (requests.RequestException, ValueError) as e:
             logger.debug(f"Error getting OMA fingerprint for {uniprot_id}: {e}")
 
         return None
 
-    def batch_get_oma_fingerprints(self, uniprot_ids: List[str]) -> Dict[str, str]:
-        logger.info(f"Fetching OMA fingerprints for {len(uniprot_ids)} UniProt IDs")
-        oma_mapping = {}
+    @staticmethod
+    def _oma_xref_from_entry(data: Dict) -> Optional[str]:
+        """
+        Pick the OMA cross-reference out of a UniProt JSON entry.
+        """
+        for xref in data.get('uniProtKBCrossReferences', []):
+            if xref.get('database') == 'OMA':
+                return xref['id']
+        return None
 
-        for i, uniprot_id in enumerate(uniprot_ids, 1):
-            if i % 50 == 0:
-                logger.info(f"Processed {i}/{len(uniprot_ids)} UniProt IDs")
+    def _get_oma_xrefs(self, uniprot_ids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Fetch the OMA cross-reference of up to _UNIPROT_BATCH_SIZE accessions
+        with one UniProt search. Accessions UniProt returns without an OMA
+        cross-reference map to None; accessions it doesn't return are left out.
+        """
+        url = f"{self.uniprot_base_url}/uniprotkb/search"
+        params = {
+            'query': " OR ".join(f"accession:{uniprot_id}" for uniprot_id in uniprot_ids),
+            'fields': 'accession,xref_oma',
+            'format': 'json',
+            'size': len(uniprot_ids)
+        }
 
-            oma_id = self.get_oma_fingerprint(uniprot_id)
-            if oma_id:
-                oma_mapping[uniprot_id] = oma_id
+        try:
+            self._wait_for_rate_limit()
+            response = self.session.get(url, params=params, timeout=30)
+            response.raise_for_status()
+            data = _loads(response.content)
+        except (requests.RequestException, ValueError) as e:
+            logger.debug(f"Batch OMA cross-reference lookup for {len(uniprot_ids)} UniProt IDs failed: {e}")
+            return {}
+
+        return {result['primaryAccession']: self._oma_xref_from_entry(result)
+                for result in data.get('results', [])}
+
+    def _get_oma_groups(self, uniprot_ids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Fetch the OMA groups of up to _OMA_BATCH_SIZE UniProt IDs with one OMA
+        bulk_retrieve request. IDs OMA answers for without a group (or doesn't
+        know) map to None; IDs missing from the answer, or the whole batch if
+        the request failed, are left out.
+        """
+        url = f"{self.oma_base_url}protein/bulk_retrieve/"
+
+        try:
+            self._wait_for_rate_limit()
+            response = self.session.post(url, json={'ids': uniprot_ids}, timeout=60)
+            response.raise_for_status()
+            data = _loads(response.content)
+        except (requests.RequestException, ValueError) as e:
+            logger.debug(f"Bulk OMA lookup for {len(uniprot_ids)} UniProt IDs failed: {e}")
+            return {}
 
-            time.sleep(self.request_delay)
+        oma_groups = {}
+        for entry in data:
+            if not isinstance(entry, dict):
+                continue
+            # Each answer is {'query_id': ..., 'target': <protein or null>};
+            # query_id is the ID as sent, while the protein's canonicalid may
+            # be another cross-reference of it
+            target = entry.get('target', entry)
+            if target is not None and not isinstance(target, dict):
+                continue
+            uniprot_id = entry.get('query_id') or (target or {}).get('canonicalid')
+            if uniprot_id:
+                oma_groups[uniprot_id] = (target or {}).get('oma_group') or None
+        return oma_groups
+
+    def batch_get_oma_fingerprints(self, uniprot_ids: List[str]) -> Dict[str, str]:
+        """
+        Look up the OMA group of every UniProt ID, _OMA_BATCH_SIZE per OMA
+        bulk_retrieve request with several batches in flight. Cached groups are
+        reused. IDs OMA has no group for are checked for an OMA cross-reference
+        with batched UniProt searches; only IDs missing from the bulk answers
+        are looked up one by one. Group numbers are mapped to fingerprints.
+        Results keep the order of uniprot_ids.
+        """
+        logger.info(f"Fetching OMA fingerprints for {len(uniprot_ids)} UniProt IDs")
+        found = {}
+        for uniprot_id in dict.fromkeys(uniprot_ids):
+            oma_id = self._kv_get('oma', uniprot_id)
+            if oma_id is not None:
+                found[uniprot_id] = oma_id
+
+        unique_ids = [uniprot_id for uniprot_id in dict.fromkeys(uniprot_ids) if uniprot_id not in found]
+        batches = [unique_ids[i:i + _OMA_BATCH_SIZE] for i in range(0, len(unique_ids), _OMA_BATCH_SIZE)]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for i, batch_groups in enumerate(executor.map(self._get_oma_groups, batches), 1):
+                logger.info(f"Processed {min(i * _OMA_BATCH_SIZE, len(unique_ids))}/{len(unique_ids)} UniProt IDs")
+                found.update(batch_groups)
+                for uniprot_id, oma_id in batch_groups.items():
+                    self._kv_set('oma', uniprot_id, oma_id)
+
+            no_group_ids = [uniprot_id for uniprot_id in unique_ids if uniprot_id in found and found[uniprot_id] is None]
+            xref_batches = [no_group_ids[i:i + _UNIPROT_BATCH_SIZE] for i in range(0, len(no_group_ids), _UNIPROT_BATCH_SIZE)]
+            for batch_xrefs in executor.map(self._get_oma_xrefs, xref_batches):
+                for uniprot_id, oma_id in batch_xrefs.items():
+                    if oma_id and uniprot_id in found:
+                        found[uniprot_id] = oma_id
+                        self._kv_set('oma', uniprot_id, oma_id)
+
+            missing_ids = [uniprot_id for uniprot_id in unique_ids if uniprot_id not in found]
+            if missing_ids:
+                logger.info(f"Looking up {len(missing_ids)} UniProt IDs missing from the bulk answers one by one")
+            found.update(zip(missing_ids, executor.map(self.get_oma_fingerprint, missing_ids)))
+
+            # OMA answers with numeric group numbers but UniProt with
+            # fingerprints; map the numbers to fingerprints too, so one group
+            # is never counted under two keys. Each number is resolved once.
+            group_numbers = list(dict.fromkeys(
+                oma_id for oma_id in found.values()
+                if oma_id and not (isinstance(oma_id, str) and _FINGERPRINT_RE.match(oma_id))))
+            fingerprints = dict(zip(group_numbers, executor.map(self.get_oma_fingerprint_from_group, group_numbers)))
+
+        for group_number, fingerprint in fingerprints.items():
+            if not fingerprint:
+                logger.warning(f"Could not resolve OMA group {group_number} to a fingerprint; counting it by group number")
+
+        oma_mapping = {uniprot_id: fingerprints.get(found[uniprot_id]) or found[uniprot_id]
+                       for uniprot_id in uniprot_ids if found.get(uniprot_id)}
 
         logger.info(f"Found OMA fingerprints for {len(oma_mapping)} out of {len(uniprot_ids)} UniProt IDs")
         return oma_mapping
@@ -173,24 +510,34 @@ class PfamOMAAnalyzer:
         """
         oma_counts = Counter(oma_mapping.values())
 
-        frequent_omas = {}
-        for oma_id, count in oma_counts.items():
-            if count >= min_count:
-                frequent_omas[oma_id] = count
-
-        frequent_omas = dict(sorted(frequent_omas.items(), key=lambda x: x[1], reverse=True))
+        # most_common is already sorted by count (ties in first-seen order)
+        frequent_omas = {oma_id: count for oma_id, count in oma_counts.most_common() if count >= min_count}
         logger.info(f"Found {len(frequent_omas)} OMA groups with at least {min_count} occurrences")
         return frequent_omas
 
     def get_oma_fingerprint_from_group(self, oma_id: str) -> Optional[str]:
         """
-        Get the OMA fingerprint for a given OMA group ID.
+        Get the OMA fingerprint for a given OMA group ID. IDs that already are
+        fingerprints are returned as they are, and fingerprints looked up
+        before come from the result cache, so only new group numbers cost a
+        request.
         """
+        if isinstance(oma_id, str) and _FINGERPRINT_RE.match(oma_id):
+            return oma_id
+
+        fingerprint = self._kv_get('fingerprint', oma_id)
+        if fingerprint is None:
+            fingerprint = self._fetch_oma_fingerprint_from_group(oma_id)
+            self._kv_set('fingerprint', oma_id, fingerprint)
+        return fingerprint
+
+    def _fetch_oma_fingerprint_from_group(self, oma_id) -> Optional[str]:
         try:
             url = f"{self.oma_base_url}group/{oma_id}/"
-            response = requests.get(url, timeout=10)
+            self._wait_for_rate_limit()
+            response = self.session.get(url, timeout=10)
             response.raise_for_status()
-            data = response.json()
+            data = _loads(response.content)
             
             # The fingerprint is typically the OMA group ID itself
             if 'fingerprint' in data:
@@ -199,43 +546,42 @@ class PfamOMAAnalyzer:
                 # If no explicit fingerprint field, use the group ID
                 return oma_id
                 
-        except requests.RequestException as e:
+        except (requests.RequestException, ValueError) as e:
             logger.error(f"Error fetching OMA group {oma_id}: {e}")
             return None
 
-    def get_uniprot_ids_with_oma_fingerprint(self, fingerprint: str) -> List[str]:
+    def get_uniprot_ids_with_oma_fingerprint(self, fingerprint: str) -> Optional[List[str]]:
         """
         Search UniProt for all proteins with a specific OMA fingerprint.
-        Uses UniProt's search API with the query: (xref:oma-FINGERPRINT)
+        Uses UniProt's stream API with the query: (xref:oma-FINGERPRINT),
+        reading the accessions as TSV lines as they arrive, with no page limit.
+        Returns None if the search failed.
         """
         try:
             # Correct UniProt search query for OMA cross-references
             query = f'(xref:oma-{fingerprint})'
-            url = f"{self.uniprot_base_url}/uniprotkb/search"
+            url = f"{self.uniprot_base_url}/uniprotkb/stream"
             
             params = {
                 'query': query,
-                'format': 'json',
-                'size': 500  # Adjust size as needed
+                'fields': 'accession',  # Only the accessions are used
+                'format': 'tsv'
             }
             
-            response = requests.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            uniprot_ids = []
-            
-            if 'results' in data:
-                for result in data['results']:
-                    if 'primaryAccession' in result:
-                        uniprot_ids.append(result['primaryAccession'])
+            self._wait_for_rate_limit()
+            with self.session.get(url, params=params, stream=True, timeout=60) as response:
+                response.raise_for_status()
+
+                lines = response.iter_lines()
+                next(lines, None)  # Header row ("Entry")
+                uniprot_ids = [line.decode('ascii').strip() for line in lines if line]
             
             logger.info(f"Found {len(uniprot_ids)} UniProt IDs with OMA fingerprint {fingerprint}")
             return uniprot_ids
             
-        except requests.RequestException as e:
+        except (requests.RequestException, ValueError) as e:
             logger.error(f"Error searching UniProt for OMA fingerprint {fingerprint}: {e}")
-            return []
+            return None
 
     def get_oma_group_members_with_valid_uniprot(self, oma_id: str) -> List[Dict]:
         """
@@ -243,47 +589,77 @@ class PfamOMAAnalyzer:
         """
         try:
             url = f"{self.oma_base_url}group/{oma_id}/"
-            response = requests.get(url, timeout=10)
+            self._wait_for_rate_limit()
+            response = self.session.get(url, timeout=10)
             response.raise_for_status()
-            data = response.json()
+            data = _loads(response.content)
+            # The same response carries the group's fingerprint; keep it so a
+            # later get_oma_fingerprint_from_group needn't fetch it again
+            self._kv_set('fingerprint', oma_id, data.get('fingerprint'))
             
             valid_members = []
             
             if 'members' in data:
-                for member in data['members']:
-                    # Extract potential UniProt ID
-                    uniprot_id = member.get('canonicalid', '')
-                    
-                    # Validate UniProt ID format and check if it exists
-                    if uniprot_id and re.match(r'^[A-Z0-9]{6,10}$', uniprot_id):
-                        # Verify the UniProt ID exists by making a quick API call
-                        if self._validate_uniprot_id(uniprot_id):
-                            member_info = {
-                                'uniprot_id': uniprot_id,
-                                'species': member.get('species', {}).get('name', ''),
-                                'taxon_id': member.get('species', {}).get('taxon_id', ''),
-                                'kingdom': self._get_kingdom_from_taxon(member.get('species', {}).get('taxon_id', ''))
-                            }
-                            valid_members.append(member_info)
+                # Keep members whose UniProt ID is well formed, then check that
+                # those IDs exist with batched UniProt searches
+                candidates = [member for member in data['members']
+                              if member.get('canonicalid') and _UNIPROT_RE.match(member['canonicalid'])]
+                existing_ids = self._validate_uniprot_ids_batch([member['canonicalid'] for member in candidates])
+
+                for member in candidates:
+                    if member['canonicalid'] in existing_ids:
+                        member_info = {
+                            'uniprot_id': member['canonicalid'],
+                            'species': member.get('species', {}).get('name', ''),
+                            'taxon_id': member.get('species', {}).get('taxon_id', ''),
+                            'kingdom': self._get_kingdom_from_taxon(member.get('species', {}).get('taxon_id', ''))
+                        }
+                        valid_members.append(member_info)
             
             logger.info(f"Found {len(valid_members)} members with valid UniProt IDs for OMA group {oma_id}")
             return valid_members
 
-        except requests.RequestException as e:
+        except (requests.RequestException, ValueError) as e:
             logger.error(f"Error fetching OMA group {oma_id}: {e}")
             return []
 
-    def _validate_uniprot_id(self, uniprot_id: str) -> bool:
+    def _get_existing_uniprot_ids(self, uniprot_ids: List[str]) -> Set[str]:
         """
-        Validate that a UniProt ID exists by checking the UniProt API.
+        Return which of up to _UNIPROT_BATCH_SIZE accessions exist in UniProt,
+        with one search request.
         """
+        url = f"{self.uniprot_base_url}/uniprotkb/search"
+        params = {
+            'query': " OR ".join(f"accession:{uniprot_id}" for uniprot_id in uniprot_ids),
+            'fields': 'accession',
+            'format': 'json',
+            'size': len(uniprot_ids)
+        }
+
         try:
-            url = f"{self.uniprot_base_url}/uniprotkb/{uniprot_id}"
-            response = requests.head(url, timeout=5)  # Use HEAD to avoid downloading full data
-            time.sleep(0.05)  # Small delay to be respectful to the API
-            return response.status_code == 200
-        except requests.RequestException:
-            return False
+            self._wait_for_rate_limit()
+            response = self.session.get(url, params=params, timeout=30)
+            response.raise_for_status()
+            data = _loads(response.content)
+        except (requests.RequestException, ValueError) as e:
+            logger.debug(f"Batch validation of {len(uniprot_ids)} UniProt IDs failed: {e}")
+            return set()
+
+        return {result['primaryAccession'] for result in data.get('results', [])}
+
+    def _validate_uniprot_ids_batch(self, uniprot_ids: List[str]) -> Set[str]:
+        """
+        Validate that UniProt IDs exist, _UNIPROT_BATCH_SIZE per search request
+        with several batches in flight, instead of one HEAD request per ID.
+        """
+        unique_ids = list(dict.fromkeys(uniprot_ids))
+        batches = [unique_ids[i:i + _UNIPROT_BATCH_SIZE] for i in range(0, len(unique_ids), _UNIPROT_BATCH_SIZE)]
+
+        existing_ids = set()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for batch_ids in executor.map(self._get_existing_uniprot_ids, batches):
+                existing_ids.update(batch_ids)
+        return existing_ids
 
     def _get_kingdom_from_lineage(self, lineage: List[str]) -> str:
         """
@@ -318,39 +694,117 @@ class PfamOMAAnalyzer:
         
         taxon_id = str(taxon_id)
         
-        # More specific bacterial taxonomy
+        # One dict lookup per prefix length, longest first, so e.g. 2759 and
+        # 2763 are matched before the catch-all for IDs starting with 2
+        for length in _KINGDOM_PREFIX_LENGTHS:
+            kingdom = _KINGDOM_PREFIX.get(taxon_id[:length])
+            if kingdom:
+                return kingdom
+
         if taxon_id.startswith('2'):
-            if taxon_id.startswith('2157'):
-                return "Archaea"
-            else:
-                return "Bacteria"
+            return "Bacteria"
+        return "Unknown"
+
+    def _process_one_group(self, oma_id: str, count: int, pfam_uniprot_set: FrozenSet[str]) -> Dict:
+        """
+        Resolve one frequent OMA group's fingerprint and fetch its members.
+        Runs in a worker thread and returns the group details; lookup_failed
+        is set when either request failed, so the members may be incomplete.
+        """
+        logger.info(f"Processing OMA group {oma_id} (count: {count})")
+        lookup_failed = False
         
-        # Eukaryotic kingdoms with better separation
-        elif taxon_id.startswith('33208'):  # Metazoa
-            return "Metazoa"
-        elif taxon_id.startswith('33090'):  # Viridiplantae
-            return "Viridiplantae"
-        elif taxon_id.startswith('4751'):   # Fungi
-            return "Fungi"
-        elif taxon_id.startswith('554915'): # Amoebozoa
-            return "Amoebozoa"
-        elif taxon_id.startswith('2763'):   # Rhodophyta
-            return "Rhodophyta"
-        elif taxon_id.startswith('3027'):   # Cryptophyta
-            return "Cryptophyta"
-        elif taxon_id.startswith('5878'):   # Ciliophora
-            return "Ciliophora"
-        elif taxon_id.startswith('5747'):   # Apicomplexa
-            return "Apicomplexa"
-        elif taxon_id.startswith('207245'): # Diplomonadida
-            return "Diplomonadida"
-        elif taxon_id.startswith('2759'):   # Other Eukaryota
-            return "Other Eukaryota"
-        else:
-            return "Unknown"
+        # Get the OMA fingerprint for this group
+        fingerprint = self.get_oma_fingerprint_from_group(oma_id)
+        if not fingerprint:
+            logger.warning(f"Could not get fingerprint for OMA group {oma_id}, using group ID as fingerprint")
+            fingerprint = oma_id
+            lookup_failed = True
+        
+        logger.info(f"Using fingerprint '{fingerprint}' for OMA group {oma_id}")
+        # Get all UniProt IDs with this fingerprint
+        oma_uniprot_ids_list = self.get_uniprot_ids_with_oma_fingerprint(fingerprint)
+        if oma_uniprot_ids_list is None:
+            oma_uniprot_ids_list = []
+            lookup_failed = True
+        
+        # Filter out UniProt IDs that are already in the Pfam family while
+        # building the set, so members in Pfam are never copied into it
+        oma_uniprot_ids = {uniprot_id for uniprot_id in oma_uniprot_ids_list
+                           if uniprot_id not in pfam_uniprot_set}
+
+        return {
+            'count': count,
+            'total_members': len(oma_uniprot_ids_list),
+            'fingerprint': fingerprint,
+            'uniprot_ids': oma_uniprot_ids,
+            'lookup_failed': lookup_failed
+        }
+
+    @staticmethod
+    def _scores_signature(pfam_folder: str) -> Tuple[str, int, float]:
+        """
+        Identify the scores file a result was computed from: its absolute
+        path, size and modification time.
+        """
+        scores_file = os.path.abspath(os.path.join(pfam_folder, "scores"))
+        stat = os.stat(scores_file)
+        return scores_file, stat.st_size, stat.st_mtime
+
+    def _load_saved_results(self, pfam_folder: str, pfam_id: str, min_count: int) -> Optional[Dict]:
+        """
+        Return the results pickled by an earlier run if they were computed from
+        this very scores file (same path, size and mtime) with the same
+        min_count, else None.
+        """
+        results_file = f"{pfam_id}.pkl"
+        if not os.path.exists(results_file):
+            return None
+
+        try:
+            signature = self._scores_signature(pfam_folder)
+            with open(results_file, 'rb') as f:
+                saved = _ResultsUnpickler(f).load()
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError) as e:
+            logger.warning(f"Could not read saved results {results_file}: {e}")
+            return None
+
+        if (not isinstance(saved, dict) or saved.get('scores') != signature
+                or saved.get('min_count') != min_count or not isinstance(saved.get('results'), dict)):
+            return None
+        return saved['results']
+
+    def _save_results(self, pfam_folder: str, results: Dict):
+        """
+        Pickle the analysis results to <pfam_id>.pkl, together with the scores
+        file signature and min_count they were computed from, so a re-run can
+        skip the network work. The file is written under a temporary name and
+        moved into place, so an interrupted run never leaves a truncated pickle
+        behind.
+        """
+        results_file = f"{results['pfam_id']}.pkl"
+        tmp_file = results_file + ".tmp"
+        try:
+            saved = {
+                'scores': self._scores_signature(pfam_folder),
+                'min_count': results['min_count'],
+                'results': results
+            }
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(saved, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, results_file)
+        except OSError as e:
+            logger.warning(f"Could not save results to {results_file}: {e}")
 
     def analyze_pfam_family(self, pfam_folder: str, min_count: int = 3) -> Dict:
         pfam_id = self.get_pfam_id_from_folder(pfam_folder)
+
+        if self.use_cache:
+            results = self._load_saved_results(pfam_folder, pfam_id, min_count)
+            if results:
+                logger.info(f"Using saved results for {pfam_id} from {pfam_id}.pkl")
+                return results
+
         logger.info(f"Starting analysis of Pfam family {pfam_id} from folder {pfam_folder}")
 
         pfam_uniprot_ids = self.read_pfam_scores_file(pfam_folder)
@@ -358,8 +812,11 @@ class PfamOMAAnalyzer:
             logger.error(f"No UniProt IDs found in scores file from {pfam_folder}")
             return {}
 
-        pfam_uniprot_set = set(pfam_uniprot_ids)
-        oma_mapping = self.batch_get_oma_fingerprints(pfam_uniprot_ids)
+        pfam_uniprot_set = frozenset(pfam_uniprot_ids)
+        # A protein can have several hits in the scores file; look each up
+        # once (order kept), while the results still report every hit
+        unique_ids = list(dict.fromkeys(pfam_uniprot_ids))
+        oma_mapping = self.batch_get_oma_fingerprints(unique_ids)
         if not oma_mapping:
             logger.error("No OMA fingerprints found")
             return {}
@@ -369,32 +826,15 @@ class PfamOMAAnalyzer:
         all_oma_uniprot_ids = set()
         oma_details = {}
 
-        for oma_id, count in frequent_omas.items():
-            logger.info(f"Processing OMA group {oma_id} (count: {count})")
-            
-            # Get the OMA fingerprint for this group
-            fingerprint = self.get_oma_fingerprint_from_group(oma_id)
-            if not fingerprint:
-                logger.warning(f"Could not get fingerprint for OMA group {oma_id}, using group ID as fingerprint")
-                fingerprint = oma_id
-            
-            logger.info(f"Using fingerprint '{fingerprint}' for OMA group {oma_id}")
-            # Get all UniProt IDs with this fingerprint
-            oma_uniprot_ids_list = self.get_uniprot_ids_with_oma_fingerprint(fingerprint)
-            
-            # Filter out UniProt IDs that are already in the Pfam family
-            oma_uniprot_ids = set(oma_uniprot_ids_list) - pfam_uniprot_set
-
-            all_oma_uniprot_ids.update(oma_uniprot_ids)
+        # Groups are independent, so several are resolved at once; map keeps
+        # them in frequent_omas order
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            group_details = executor.map(
+                lambda item: self._process_one_group(item[0], item[1], pfam_uniprot_set), frequent_omas.items())
 
-            oma_details[oma_id] = {
-                'count': count,
-                'total_members': len(oma_uniprot_ids_list),
-                'fingerprint': fingerprint,
-                'uniprot_ids': oma_uniprot_ids
-            }
-
-            time.sleep(self.request_delay)
+            for oma_id, details in zip(frequent_omas, group_details):
+                all_oma_uniprot_ids |= details['uniprot_ids']
+                oma_details[oma_id] = details
 
         unique_to_oma = all_oma_uniprot_ids
         results = {
@@ -411,49 +851,34 @@ class PfamOMAAnalyzer:
         }
 
         logger.info(f"Analysis complete. Found {len(unique_to_oma)} UniProt IDs unique to OMA")
+        failed_groups = [oma_id for oma_id, details in oma_details.items() if details['lookup_failed']]
+        if failed_groups:
+            logger.warning(f"Lookups failed for {len(failed_groups)} OMA groups; not saving results for reuse")
+        elif self.use_cache:
+            self._save_results(pfam_folder, results)
         return results
 
     def generate_report(self, results: Dict, output_file: str = "report.txt") -> str:
+        """
+        Write the report to output_file line by line through a large buffer,
+        rather than building the whole text in memory first.
+        """
         if not results:
             return "No results to report."
 
-        lines = []
-        lines.append("="*80)
-        lines.append(f"PFAM-OMA ORTHOLOG ANALYSIS REPORT")
-        lines.append("="*80)
-        lines.append(f"Pfam Family: {results['pfam_id']}")
-        lines.append(f"Minimum Count Threshold: {results['min_count']}")
-        lines.append(f"Analysis Date: {time.strftime('%Y-%m-%d %H:%M:%S')}")
-        lines.append("")
-        lines.append("SUMMARY STATISTICS")
-        lines.append("-" * 50)
-        lines.append(f"Total UniProt IDs in Pfam family: {results['pfam_uniprot_count']}")
-        lines.append(f"UniProt IDs with OMA fingerprints: {len(results['oma_mapping'])}")
-        lines.append(f"Frequent OMA groups (>={results['min_count']} occurrences): {len(results['frequent_omas'])}")
-        lines.append(f"UniProt IDs unique to OMA: {results['unique_to_oma_count']}")
-        lines.append("")
-
-        lines.append(f"FREQUENT OMA GROUPS (>={results['min_count']} occurrences)")
-        lines.append("-" * 50)
-        for oma_id, count in results['frequent_omas'].items():
-            total_members = results['oma_details'][oma_id]['total_members']
-            lines.append(f"{oma_id}: {count} occurrences in Pfam, {total_members} total valid members")
-        lines.append("")
-
+        # Group by kingdom for better organization; descriptions are fetched
+        # up front, so the file is only open while writing
+        kingdom_groups = {}
         if results['unique_to_oma_ids']:
-            lines.append("UNIPROT IDs UNIQUE TO OMA (Not in Pfam)")
-            lines.append("-" * 50)
-            
-            # Group by kingdom for better organization
-            kingdom_groups = {}
-            
             logger.info("Fetching UniProt descriptions and kingdom information...")
+            # Fetch each unique ID's description once, however many groups list it
+            all_ids = sorted({uniprot_id for details in results['oma_details'].values()
+                              for uniprot_id in details['uniprot_ids']})
+            descriptions = self.batch_get_descriptions(all_ids)
+
             for oma_id, details in results['oma_details'].items():
                 if details['uniprot_ids']:
                     for uniprot_id in details['uniprot_ids']:
-                        # Get description
-                        description = self.get_uniprot_description(uniprot_id)
-                        
                         # For now, we'll use a simplified kingdom classification
                         # You might want to enhance this by fetching organism info from UniProt
                         kingdom = "Eukaryota"  # Default assumption
@@ -463,44 +888,68 @@ class PfamOMAAnalyzer:
                         
                         kingdom_groups[kingdom].append({
                             'uniprot_id': uniprot_id,
-                            'description': description,
+                            'description': descriptions.get(uniprot_id, "Unknown"),
                             'oma_id': oma_id
                         })
-            
-            # Sort kingdoms for consistent output
-            for kingdom in sorted(kingdom_groups.keys()):
-                lines.append(f"KINGDOM: {kingdom}")
-                lines.append("=" * 40)
-                
-                # Sort by UniProt ID
-                sorted_entries = sorted(kingdom_groups[kingdom], key=lambda x: x['uniprot_id'])
-                
-                for entry in sorted_entries:
-                    lines.append(f"      {entry['uniprot_id']} | {entry['description']} | OMA: {entry['oma_id']}")
-                
-                lines.append("")
-        else:
-            lines.append("No UniProt IDs found that are unique to OMA groups.")
-
-        lines.append("="*80)
 
-        report_text = "\n".join(lines)
-        
         # Always write to report file
         try:
-            with open(output_file, 'w') as f:
-                f.write(report_text)
+            with open(output_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                w = f.write
+                w("=" * 80 + "\n")
+                w("PFAM-OMA ORTHOLOG ANALYSIS REPORT\n")
+                w("=" * 80 + "\n")
+                w(f"Pfam Family: {results['pfam_id']}\n")
+                w(f"Minimum Count Threshold: {results['min_count']}\n")
+                w(f"Analysis Date: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+                w("\n")
+                w("SUMMARY STATISTICS\n")
+                w("-" * 50 + "\n")
+                w(f"Total UniProt IDs in Pfam family: {results['pfam_uniprot_count']}\n")
+                w(f"UniProt IDs with OMA fingerprints: {len(results['oma_mapping'])}\n")
+                w(f"Frequent OMA groups (>={results['min_count']} occurrences): {len(results['frequent_omas'])}\n")
+                w(f"UniProt IDs unique to OMA: {results['unique_to_oma_count']}\n")
+                w("\n")
+
+                w(f"FREQUENT OMA GROUPS (>={results['min_count']} occurrences)\n")
+                w("-" * 50 + "\n")
+                for oma_id, count in results['frequent_omas'].items():
+                    total_members = results['oma_details'][oma_id]['total_members']
+                    w(f"{oma_id}: {count} occurrences in Pfam, {total_members} total valid members\n")
+                w("\n")
+
+                if results['unique_to_oma_ids']:
+                    w("UNIPROT IDs UNIQUE TO OMA (Not in Pfam)\n")
+                    w("-" * 50 + "\n")
+
+                    # Sort kingdoms for consistent output
+                    for kingdom in sorted(kingdom_groups.keys()):
+                        w(f"KINGDOM: {kingdom}\n")
+                        w("=" * 40 + "\n")
+
+                        # Sort by UniProt ID
+                        for entry in sorted(kingdom_groups[kingdom], key=lambda x: x['uniprot_id']):
+                            w(f"      {entry['uniprot_id']} | {entry['description']} | OMA: {entry['oma_id']}\n")
+
+                        w("\n")
+                else:
+                    w("No UniProt IDs found that are unique to OMA groups.\n")
+
+                w("=" * 80)
+
             logger.info(f"Report saved to {output_file}")
+            return f"Report successfully written to {output_file}"
+
         except IOError as e:
             logger.error(f"Failed to write report to {output_file}: {e}")
-        
-        return report_text
+            return f"Error: Failed to write report to {output_file}: {e}"
 
 def main():
     parser = argparse.ArgumentParser(description="Analyze Pfam families vs OMA ortholog groups using local Pfam folder")
     parser.add_argument("pfam_folder", help="Path to Pfam family folder containing the 'scores' file")
     parser.add_argument("--output", "-o", default="report.txt", help="Output file for the report (default: report.txt)")
     parser.add_argument("--min-count", "-c", type=int, default=3, help="Minimum count threshold for OMA groups (default: 3)")
+    parser.add_argument("--no-cache", action="store_true", help="Don't read or write the on-disk caches; fetch everything fresh")
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
 
     args = parser.parse_args()
@@ -517,13 +966,13 @@ def main():
         sys.exit(1)
 
     try:
-        analyzer = PfamOMAAnalyzer()
+        analyzer = PfamOMAAnalyzer(use_cache=not args.no_cache)
         results = analyzer.analyze_pfam_family(args.pfam_folder, min_count=args.min_count)
         if not results:
             sys.exit(1)
 
-        report = analyzer.generate_report(results, args.output)
-        print(f"Analysis complete. Report saved to {args.output}")
+        report_status = analyzer.generate_report(results, args.output)
+        print(f"Analysis complete. {report_status}")
 
     except KeyboardInterrupt:
         logger.info("Analysis interrupted by user")
@@ -12,67 +12,228 @@ Usage:
 import sys
 import time
 import json
-from collections import Counter
+from collections import Counter, defaultdict
 import argparse
 import logging
 from typing import Dict, List, Set, Tuple, Optional
 import re
 import os
+import threading
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 except ImportError:
     print("Error: 'requests' module is required but not installed.")
     print("Please install it using: pip3 install requests")
     sys.exit(1)
 
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# UniProt accessions looked up per search request (the UniProt page-size limit is 500)
+_UNIPROT_BATCH_SIZE = 100
+
+# Per-accession results kept on disk between runs
+_KV_CACHE_FILE = '.ortho_kv.sqlite'
+_KV_EXPIRE_SECONDS = 86400
+
+# Patterns used per line or per response, compiled once
+_UNIPROT_RE = re.compile(r'^[A-Z0-9]{6,10}$')
+_PFAM_RE = re.compile(r'^PF\d{5}$')
+# OMA group fingerprints, as returned in UniProt's OMA cross-references
+_FINGERPRINT_RE = re.compile(r'^[A-Z]{7}$')
+# Fingerprint labels scraped from OMA group web pages; only the label is
+# case-insensitive, and markup may sit between it and the ID
+_FINGERPRINT_LABEL_RE = re.compile(r'(?i:fingerprint)[:\s]*(?:<[^>]*>\s*)*([A-Z]{7})\b')
+
+class OmaDetail:
+    """
+    Summary of one frequent OMA group: its count in the Pfam family, its
+    total UniProt membership, its fingerprint and the members missing from Pfam.
+    """
+    __slots__ = ('count', 'total_members', 'fingerprint', 'uniprot_ids')
+
+    def __init__(self, count: int, total_members: int, fingerprint: str, uniprot_ids: Set[str]):
+        self.count = count
+        self.total_members = total_members
+        self.fingerprint = fingerprint
+        self.uniprot_ids = uniprot_ids
+
 class PfamOMAAnalyzer:
-    def __init__(self):
+    def __init__(self, max_workers: int = 8, use_cache: bool = True):
         self.oma_base_url = "https://omabrowser.org/api/"
         self.uniprot_base_url = "https://rest.uniprot.org"
-        self.request_delay = 0.2  # Increased delay to be more respectful to APIs
+        self.request_delay = 0.0  # Minimum spacing between requests, shared by all workers; raised on HTTP 429
+        self.max_workers = max_workers
+
+        # One pooled session so workers reuse TCP/TLS connections to OMA and
+        # UniProt; transient errors and throttling are retried with backoff.
+        # When requests-cache is installed, responses are kept on disk for a
+        # day (or as the server's Cache-Control allows) so re-runs skip them.
+        if use_cache and requests_cache is not None:
+            self.session = requests_cache.CachedSession(
+                cache_name='.ortho_cache',
+                backend='sqlite',
+                cache_control=True,
+                expire_after=_KV_EXPIRE_SECONDS
+            )
+        else:
+            self.session = requests.Session()
+        self.session.headers.update({'User-Agent': 'find_orthos/1.0'})
+        # Throttled and failing requests back off exponentially (with jitter
+        # where urllib3 supports it), waiting at least as long as Retry-After.
+        # The final response is returned rather than raised, so a lasting 429
+        # reaches _note_throttling below.
+        retry_options = dict(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                             respect_retry_after_header=True, raise_on_status=False)
+        try:
+            retries = Retry(backoff_jitter=0.5, **retry_options)
+        except TypeError:
+            retries = Retry(**retry_options)
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=max(64, max_workers), max_retries=retries)
+        self.session.mount('https://', adapter)
+
+        self._rate_lock = threading.Lock()
+        self._next_request_time = 0.0
+        self.session.hooks['response'].append(self._note_throttling)
+
+        # Looked-up OMA groups, fingerprints and descriptions are also kept per
+        # accession, so they are reused whichever batch they turn up in later.
+        self._kv = None
+        self._kv_lock = threading.Lock()
+        if use_cache:
+            try:
+                self._kv = sqlite3.connect(_KV_CACHE_FILE, check_same_thread=False)
+                with self._kv:
+                    self._kv.execute("CREATE TABLE IF NOT EXISTS kv "
+                                     "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)")
+            except sqlite3.Error as e:
+                logger.warning("Could not open result cache %s: %s", _KV_CACHE_FILE, e)
+                self._kv = None
+
+    def _wait_for_rate_limit(self):
+        """
+        Block until the shared rate limit allows another request to be sent.
+        """
+        with self._rate_lock:
+            now = time.monotonic()
+            wait = self._next_request_time - now
+            self._next_request_time = max(now, self._next_request_time) + self.request_delay
+
+        if wait > 0:
+            time.sleep(wait)
+
+    def _note_throttling(self, response, *args, **kwargs):
+        """
+        Response hook: when a server is still answering 429 after the retries,
+        space out all further requests (doubling the delay, up to 5 seconds).
+        """
+        if response.status_code == 429:
+            with self._rate_lock:
+                self.request_delay = min(max(2 * self.request_delay, 0.2), 5.0)
+            logger.warning("Throttled by %s; spacing requests %.1fs apart", response.url, self.request_delay)
+
+    def _kv_get_many(self, kind: str, keys: List) -> Dict:
+        """
+        Return the unexpired cached results of the given kind, by key.
+        """
+        if self._kv is None or not keys:
+            return {}
+
+        cache_keys = {f"{kind}:{key}": key for key in keys}
+        found = {}
+        cache_key_list = list(cache_keys)
+        with self._kv_lock:
+            try:
+                # Stay well below SQLite's limit on query parameters
+                for i in range(0, len(cache_key_list), 500):
+                    chunk = cache_key_list[i:i + 500]
+                    rows = self._kv.execute(
+                        f"SELECT key, value FROM kv WHERE expires > ? AND key IN ({','.join('?' * len(chunk))})",
+                        [time.time()] + chunk)
+                    for cache_key, value in rows:
+                        found[cache_keys[cache_key]] = _loads(value)
+            except sqlite3.Error as e:
+                logger.debug("Result cache lookup failed: %s", e)
+        return found
+
+    def _kv_get(self, kind: str, key):
+        return self._kv_get_many(kind, [key]).get(key)
+
+    def _kv_set_many(self, kind: str, values: Dict):
+        """
+        Cache results of the given kind for _KV_EXPIRE_SECONDS. Empty results are
+        not stored, since they can come from a failed request.
+        """
+        rows = [(f"{kind}:{key}", json.dumps(value), time.time() + _KV_EXPIRE_SECONDS)
+                for key, value in values.items() if value and value != "Unknown"]
+        if self._kv is None or not rows:
+            return
+
+        with self._kv_lock:
+            try:
+                with self._kv:
+                    self._kv.executemany("INSERT OR REPLACE INTO kv VALUES (?, ?, ?)", rows)
+            except sqlite3.Error as e:
+                logger.debug("Result cache update failed: %s", e)
+
+    def _kv_set(self, kind: str, key, value):
+        self._kv_set_many(kind, {key: value})
 
     def read_pfam_scores_file(self, pfam_folder: str) -> List[str]:
         scores_file = os.path.join(pfam_folder, "scores")
 
         if not os.path.exists(scores_file):
-            logger.error(f"Scores file not found: {scores_file}")
+            logger.error("Scores file not found: %s", scores_file)
             return []
 
-        logger.info(f"Reading UniProt IDs from {scores_file}")
+        logger.info("Reading UniProt IDs from %s", scores_file)
         uniprot_ids = []
 
         try:
-            with open(scores_file, 'r') as f:
+            with open(scores_file, 'r', buffering=1 << 20) as f:
                 for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    if not line or line.startswith('#'):
+                    # Only the first two columns matter; split() also drops surrounding whitespace
+                    parts = line.split(None, 2)
+                    if len(parts) < 2 or parts[0][0] == '#':
                         continue
 
-                    parts = line.split()
-                    if len(parts) < 2:
-                        continue
-
-                    potential_uniprot = parts[1]
-                    uniprot_id = potential_uniprot.split('.')[0] if '.' in potential_uniprot else potential_uniprot
+                    uniprot_id = parts[1].partition('.')[0]
 
-                    if re.match(r'^[A-Z0-9]{6,10}$', uniprot_id):
+                    if _UNIPROT_RE.match(uniprot_id):
                         uniprot_ids.append(uniprot_id)
                     else:
-                        logger.debug(f"Skipping invalid UniProt ID format on line {line_num}: {uniprot_id}")
+                        logger.debug("Skipping invalid UniProt ID format on line %d: %s", line_num, uniprot_id)
         except Exception as e:
-            logger.error(f"Error reading scores file: {e}")
+            logger.error("Error reading scores file: %s", e)
             return []
 
-        logger.info(f"Extracted {len(uniprot_ids)} UniProt IDs from scores file")
+        logger.info("Extracted %d UniProt IDs from scores file", len(uniprot_ids))
         return uniprot_ids
 
     def get_pfam_id_from_folder(self, pfam_folder: str) -> str:
         folder_name = os.path.basename(pfam_folder.rstrip('/'))
-        if re.match(r'^PF\d{5}$', folder_name):
+        if _PFAM_RE.match(folder_name):
             return folder_name
 
         desc_file = os.path.join(pfam_folder, "DESC")
@@ -82,89 +243,243 @@ class PfamOMAAnalyzer:
                     for line in f:
                         if line.startswith('AC '):
                             pfam_id = line.split()[1].rstrip(';')
-                            if re.match(r'^PF\d{5}$', pfam_id):
+                            if _PFAM_RE.match(pfam_id):
                                 return pfam_id
             except Exception as e:
-                logger.debug(f"Error reading DESC file: {e}")
+                logger.debug("Error reading DESC file: %s", e)
 
         return folder_name
 
+    @staticmethod
+    def _description_from_entry(data: Dict) -> str:
+        """
+        Pick the protein description out of a UniProt JSON entry.
+        """
+        # Extract protein name/description
+        if 'proteinDescription' in data:
+            desc = data['proteinDescription']
+            if 'recommendedName' in desc and 'fullName' in desc['recommendedName']:
+                return desc['recommendedName']['fullName']['value']
+            elif 'submissionNames' in desc and desc['submissionNames']:
+                return desc['submissionNames'][0]['fullName']['value']
+
+        # Fallback to entry name
+        if 'uniProtkbId' in data:
+            return data['uniProtkbId']
+
+        return "Unknown"
+
     def get_uniprot_description(self, uniprot_id: str) -> str:
         """
-        Get the protein description from UniProt.
+        Get the protein description from UniProt, or from the result cache.
         """
+        description = self._kv_get('description', uniprot_id)
+        if description is None:
+            description = self._fetch_uniprot_description(uniprot_id)
+            self._kv_set('description', uniprot_id, description)
+        return description
+
+    def _fetch_uniprot_description(self, uniprot_id: str) -> str:
         try:
             url = f"{self.uniprot_base_url}/uniprotkb/{uniprot_id}"
             params = {'format': 'json'}
-            response = requests.get(url, params=params, timeout=10)
+            self._wait_for_rate_limit()
+            response = self.session.get(url, params=params, timeout=10)
             
             if response.status_code == 200:
-                data = response.json()
-                # Extract protein name/description
-                if 'proteinDescription' in data:
-                    desc = data['proteinDescription']
-                    if 'recommendedName' in desc and 'fullName' in desc['recommendedName']:
-                        return desc['recommendedName']['fullName']['value']
-                    elif 'submissionNames' in desc and desc['submissionNames']:
-                        return desc['submissionNames'][0]['fullName']['value']
-                
-                # Fallback to entry name
-                if 'uniProtkbId' in data:
-                    return data['uniProtkbId']
+                return self._description_from_entry(_loads(response.content))
                     
-            time.sleep(0.1)  # Small delay to respect API limits
             return "Unknown"
             
         except requests.RequestException as e:
-            logger.debug(f"Error getting description for {uniprot_id}: {e}")
+            logger.debug("Error getting description for %s: %s", uniprot_id, e)
             return "Unknown"
         except Exception as e:
-            logger.debug(f"Error parsing description for {uniprot_id}: {e}")
+            logger.debug("Error parsing description for %s: %s", uniprot_id, e)
             return "Unknown"
 
+    def _get_descriptions(self, uniprot_ids: List[str]) -> Dict[str, str]:
+        """
+        Fetch the descriptions of up to _UNIPROT_BATCH_SIZE accessions with one
+        request. Accessions UniProt doesn't return are left out.
+        """
+        url = f"{self.uniprot_base_url}/uniprotkb/accessions"
+        params = {
+            'accessions': ",".join(uniprot_ids),
+            'fields': 'accession,id,protein_name',
+            'format': 'json'
+        }
+
+        try:
+            self._wait_for_rate_limit()
+            response = self.session.get(url, params=params, timeout=30)
+            response.raise_for_status()
+            data = _loads(response.content)
+        except (requests.RequestException, ValueError) as e:
+            logger.debug("Batch description lookup for %d UniProt IDs failed: %s", len(uniprot_ids), e)
+            return {}
+
+        return {result['primaryAccession']: self._description_from_entry(result)
+                for result in data.get('results', [])}
+
+    def batch_get_descriptions(self, uniprot_ids: List[str]) -> Dict[str, str]:
+        """
+        Get the descriptions of many UniProt IDs, _UNIPROT_BATCH_SIZE per
+        request with several batches in flight. IDs missing from the batch
+        answers are looked up one by one.
+        """
+        descriptions = self._kv_get_many('description', list(dict.fromkeys(uniprot_ids)))
+        unique_ids = [uniprot_id for uniprot_id in dict.fromkeys(uniprot_ids) if uniprot_id not in descriptions]
+        batches = [unique_ids[i:i + _UNIPROT_BATCH_SIZE] for i in range(0, len(unique_ids), _UNIPROT_BATCH_SIZE)]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for batch_descriptions in executor.map(self._get_descriptions, batches):
+                descriptions.update(batch_descriptions)
+                self._kv_set_many('description', batch_descriptions)
+
+            missing_ids = [uniprot_id for uniprot_id in unique_ids if uniprot_id not in descriptions]
+            descriptions.update(zip(missing_ids, executor.map(self.get_uniprot_description, missing_ids)))
+
+        return descriptions
+
     def get_oma_fingerprint(self, uniprot_id: str) -> Optional[str]:
+        """
+        Get the OMA group of a UniProt ID, or take it from the result cache.
+        """
+        oma_id = self._kv_get('oma', uniprot_id)
+        if oma_id is None:
+            oma_id = self._fetch_oma_fingerprint(uniprot_id)
+            self._kv_set('oma', uniprot_id, oma_id)
+        return oma_id
+
+    def _fetch_oma_fingerprint(self, uniprot_id: str) -> Optional[str]:
         try:
             # First try the OMA API directly
             url = f"{self.oma_base_url}protein/{uniprot_id}/"
-            response = requests.get(url, timeout=10)
+            self._wait_for_rate_limit()
+            response = self.session.get(url, timeout=10)
 
             if response.status_code == 200:
-                data = response.json()
+                data = _loads(response.content)
                 if 'oma_group' in data and data['oma_group']:
                     return data['oma_group']
 
-            time.sleep(self.request_delay)
-            
-            # Fallback: scrape UniProt page for OMA links
-            uniprot_url = f"https://www.uniprot.org/uniprotkb/{uniprot_id}"
-            response = requests.get(uniprot_url, timeout=10)
+            # Fallback: the OMA cross-reference of the UniProt entry
+            return self._get_uniprot_oma_xref(uniprot_id)
 
-            if response.status_code == 200:
-                oma_pattern = r'omabrowser\.org/oma/omagroup/([^/\s"]+)'
-                match = re.search(oma_pattern, response.text)
-                if match:
-                    return match.group(1)
+        except (requests.RequestException, ValueError) as e:
+            logger.debug("Error getting OMA fingerprint for %s: %s", uniprot_id, e)
 
-        except requests.RequestException as e:
-            logger.debug(f"Error getting OMA fingerprint for {uniprot_id}: {e}")
+        return None
+
+    @staticmethod
+    def _oma_xref_from_entry(data: Dict) -> Optional[str]:
+        """
+        Pick the OMA cross-reference out of a UniProt JSON entry.
+        """
+        for xref in data.get('uniProtKBCrossReferences', []):
+            if xref.get('database') == 'OMA':
+                return xref['id']
+        return None
+
+    def _get_uniprot_oma_xref(self, uniprot_id: str) -> Optional[str]:
+        """
+        Fetch only the OMA cross-reference of one UniProt entry, as JSON.
+        """
+        url = f"{self.uniprot_base_url}/uniprotkb/{uniprot_id}"
+        params = {'format': 'json', 'fields': 'xref_oma'}
+        self._wait_for_rate_limit()
+        response = self.session.get(url, params=params, timeout=10)
 
+        if response.status_code == 200:
+            return self._oma_xref_from_entry(_loads(response.content))
         return None
 
+    def _get_oma_xrefs(self, uniprot_ids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Fetch the OMA cross-reference of up to _UNIPROT_BATCH_SIZE accessions
+        with one UniProt search. Accessions UniProt returns without an OMA
+        cross-reference map to None; accessions it doesn't return are left out.
+        """
+        url = f"{self.uniprot_base_url}/uniprotkb/search"
+        params = {
+            'query': " OR ".join(f"accession:{uniprot_id}" for uniprot_id in uniprot_ids),
+            'fields': 'accession,xref_oma',
+            'format': 'json',
+            'size': len(uniprot_ids)
+        }
+
+        try:
+            self._wait_for_rate_limit()
+            response = self.session.get(url, params=params, timeout=30)
+            response.raise_for_status()
+            data = _loads(response.content)
+        except (requests.RequestException, ValueError) as e:
+            logger.debug("Batch OMA lookup for %d UniProt IDs failed: %s", len(uniprot_ids), e)
+            return {}
+
+        return {result['primaryAccession']: self._oma_xref_from_entry(result)
+                for result in data.get('results', [])}
+
+    def batch_get_oma_via_uniprot(self, uniprot_ids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Look up OMA fingerprints for many UniProt IDs with batched UniProt
+        searches instead of one OMA API call per ID.
+        """
+        unique_ids = list(dict.fromkeys(uniprot_ids))
+        batches = [unique_ids[i:i + _UNIPROT_BATCH_SIZE] for i in range(0, len(unique_ids), _UNIPROT_BATCH_SIZE)]
+
+        oma_xrefs = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for batch_xrefs in executor.map(self._get_oma_xrefs, batches):
+                oma_xrefs.update(batch_xrefs)
+        return oma_xrefs
+
     def batch_get_oma_fingerprints(self, uniprot_ids: List[str]) -> Dict[str, str]:
-        logger.info(f"Fetching OMA fingerprints for {len(uniprot_ids)} UniProt IDs")
+        """
+        Look up the OMA group fingerprint of every UniProt ID. Batched UniProt
+        searches answer most IDs; only those UniProt doesn't return go to the
+        per-ID lookup, with up to max_workers requests in flight. Group numbers
+        from the OMA API are mapped to fingerprints. Results keep the order of
+        uniprot_ids.
+        """
+        logger.info("Fetching OMA fingerprints for %d UniProt IDs", len(uniprot_ids))
         oma_mapping = {}
 
-        for i, uniprot_id in enumerate(uniprot_ids, 1):
-            if i % 50 == 0:
-                logger.info(f"Processed {i}/{len(uniprot_ids)} UniProt IDs")
+        oma_xrefs = self._kv_get_many('oma', list(dict.fromkeys(uniprot_ids)))
+        if oma_xrefs:
+            logger.info("Reusing cached OMA groups for %d UniProt IDs", len(oma_xrefs))
+        uncached_ids = [uniprot_id for uniprot_id in dict.fromkeys(uniprot_ids) if uniprot_id not in oma_xrefs]
+
+        batch_xrefs = self.batch_get_oma_via_uniprot(uncached_ids)
+        self._kv_set_many('oma', batch_xrefs)
+        oma_xrefs.update(batch_xrefs)
+        missing_ids = [uniprot_id for uniprot_id in uncached_ids if uniprot_id not in oma_xrefs]
+        if missing_ids:
+            logger.info("Looking up %d UniProt IDs individually", len(missing_ids))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            oma_xrefs.update(zip(missing_ids, executor.map(self.get_oma_fingerprint, missing_ids)))
+
+            # UniProt answers with fingerprints but the OMA API with numeric
+            # group numbers; map those to fingerprints too, so one group is
+            # never counted under two keys. Each group number is resolved once.
+            group_numbers = list(dict.fromkeys(
+                oma_id for oma_id in oma_xrefs.values()
+                if oma_id and not (isinstance(oma_id, str) and _FINGERPRINT_RE.match(oma_id))))
+            fingerprints = dict(zip(group_numbers, executor.map(self.get_oma_fingerprint_from_group, group_numbers)))
+
+        for group_number, fingerprint in fingerprints.items():
+            if not fingerprint:
+                logger.warning("Could not resolve OMA group %s to a fingerprint; counting it by group number",
+                               group_number)
 
-            oma_id = self.get_oma_fingerprint(uniprot_id)
+        for uniprot_id in uniprot_ids:
+            oma_id = oma_xrefs.get(uniprot_id)
             if oma_id:
-                oma_mapping[uniprot_id] = oma_id
+                oma_mapping[uniprot_id] = fingerprints.get(oma_id) or oma_id
 
-            time.sleep(self.request_delay)
-
-        logger.info(f"Found OMA fingerprints for {len(oma_mapping)} out of {len(uniprot_ids)} UniProt IDs")
+        logger.info("Found OMA fingerprints for %d out of %d UniProt IDs", len(oma_mapping), len(uniprot_ids))
         return oma_mapping
 
     def filter_frequent_omas(self, oma_mapping: Dict[str, str], min_count: int = 3) -> Dict[str, int]:
@@ -173,26 +488,34 @@ class PfamOMAAnalyzer:
         """
         oma_counts = Counter(oma_mapping.values())
 
-        frequent_omas = {}
-        for oma_id, count in oma_counts.items():
-            if count >= min_count:
-                frequent_omas[oma_id] = count
-
-        frequent_omas = dict(sorted(frequent_omas.items(), key=lambda x: x[1], reverse=True))
-        logger.info(f"Found {len(frequent_omas)} OMA groups with at least {min_count} occurrences")
+        # most_common is already sorted by count (ties in first-seen order)
+        frequent_omas = {oma_id: count for oma_id, count in oma_counts.most_common() if count >= min_count}
+        logger.info("Found %d OMA groups with at least %d occurrences", len(frequent_omas), min_count)
         return frequent_omas
 
     def get_oma_fingerprint_from_group(self, oma_id: str) -> Optional[str]:
         """
         Get the OMA fingerprint for a given OMA group ID by trying API first, then web scraping.
         """
+        # IDs that came from UniProt cross-references already are fingerprints
+        if isinstance(oma_id, str) and _FINGERPRINT_RE.match(oma_id):
+            return oma_id
+
+        fingerprint = self._kv_get('fingerprint', oma_id)
+        if fingerprint is None:
+            fingerprint = self._fetch_oma_fingerprint_from_group(oma_id)
+            self._kv_set('fingerprint', oma_id, fingerprint)
+        return fingerprint
+
+    def _fetch_oma_fingerprint_from_group(self, oma_id) -> Optional[str]:
         try:
             # Try the API first
             url = f"{self.oma_base_url}group/{oma_id}/"
-            response = requests.get(url, timeout=10)
+            self._wait_for_rate_limit()
+            response = self.session.get(url, timeout=10)
             
             if response.status_code == 200:
-                data = response.json()
+                data = _loads(response.content)
                 # The fingerprint might be in different fields
                 if 'fingerprint' in data:
                     return data['fingerprint']
@@ -201,25 +524,24 @@ class PfamOMAAnalyzer:
             
             # If API fails, try scraping the web interface
             web_url = f"https://omabrowser.org/oma/omagroup/{oma_id}/"
-            response = requests.get(web_url, timeout=10)
+            self._wait_for_rate_limit()
+            response = self.session.get(web_url, timeout=10)
             
             if response.status_code == 200:
-                # Look for the fingerprint in the HTML
-                # The fingerprint is usually displayed prominently on the page
-                fingerprint_pattern = r'Fingerprint[:\s]*([A-Z]{7})'
-                match = re.search(fingerprint_pattern, response.text, re.IGNORECASE)
-                if match:
+                # Read the fingerprint element when selectolax is installed
+                if HTMLParser is not None:
+                    node = HTMLParser(response.text).css_first('span.fingerprint, td.fingerprint')
+                    if node is not None and _FINGERPRINT_RE.match(node.text(strip=True)):
+                        return node.text(strip=True)
+
+                # Otherwise only trust a 7-letter ID next to its "Fingerprint" label;
+                # any other capitalised word on the page could match a bare pattern
+                match = _FINGERPRINT_LABEL_RE.search(response.text)
+                if match and _FINGERPRINT_RE.match(match.group(1)):
                     return match.group(1)
-                
-                # Alternative pattern: look for 7-character uppercase strings that might be fingerprints
-                alt_pattern = r'\b([A-Z]{7})\b'
-                matches = re.findall(alt_pattern, response.text)
-                if matches:
-                    # Return the first 7-character uppercase string found
-                    return matches[0]
-                    
-        except requests.RequestException as e:
-            logger.error(f"Error fetching OMA group {oma_id}: {e}")
+
+        except (requests.RequestException, ValueError) as e:
+            logger.error("Error fetching OMA group %s: %s", oma_id, e)
         
         return None
 
@@ -228,25 +550,10 @@ class PfamOMAAnalyzer:
         Get the OMA fingerprint by looking at a UniProt member that belongs to the OMA group.
         """
         try:
-            # Check the UniProt page for OMA cross-references
-            uniprot_url = f"https://www.uniprot.org/uniprotkb/{uniprot_id}"
-            response = requests.get(uniprot_url, timeout=10)
-            
-            if response.status_code == 200:
-                # Look for OMA fingerprint in the cross-references section
-                oma_pattern = r'omabrowser\.org/oma/omagroup/([A-Z]{7})'
-                match = re.search(oma_pattern, response.text)
-                if match:
-                    return match.group(1)
-                    
-                # Alternative pattern for OMA links
-                alt_pattern = r'OMA[:\s]*([A-Z]{7})'
-                match = re.search(alt_pattern, response.text, re.IGNORECASE)
-                if match:
-                    return match.group(1)
-                    
-        except requests.RequestException as e:
-            logger.debug(f"Error checking UniProt page for {uniprot_id}: {e}")
+            # UniProt's OMA cross-reference is the group fingerprint
+            return self._get_uniprot_oma_xref(uniprot_id)
+        except (requests.RequestException, ValueError) as e:
+            logger.debug("Error checking UniProt entry for %s: %s", uniprot_id, e)
         
         return None
 
@@ -266,10 +573,11 @@ class PfamOMAAnalyzer:
                 'size': 500  # Adjust size as needed
             }
             
-            response = requests.get(url, params=params, timeout=30)
+            self._wait_for_rate_limit()
+            response = self.session.get(url, params=params, timeout=30)
             response.raise_for_status()
             
-            data = response.json()
+            data = _loads(response.content)
             uniprot_ids = []
             
             if 'results' in data:
@@ -277,20 +585,60 @@ class PfamOMAAnalyzer:
                     if 'primaryAccession' in result:
                         uniprot_ids.append(result['primaryAccession'])
             
-            logger.info(f"Found {len(uniprot_ids)} UniProt IDs with OMA fingerprint {fingerprint}")
+            logger.info("Found %d UniProt IDs with OMA fingerprint %s", len(uniprot_ids), fingerprint)
             return uniprot_ids
             
-        except requests.RequestException as e:
-            logger.error(f"Error searching UniProt for OMA fingerprint {fingerprint}: {e}")
+        except (requests.RequestException, ValueError) as e:
+            logger.error("Error searching UniProt for OMA fingerprint %s: %s", fingerprint, e)
             return []
 
+    def _process_one_group(self, oma_id: str, count: int, oma_members: Dict[str, List[str]],
+                           pfam_uniprot_set: Set[str]) -> Optional[OmaDetail]:
+        """
+        Resolve one frequent OMA group's fingerprint and fetch its members.
+        Runs in a worker thread; returns the group details, or None if the
+        group has to be skipped.
+        """
+        logger.info("Processing OMA group %s (count: %d)", oma_id, count)
+        
+        # First, try to get the fingerprint from the OMA group
+        fingerprint = self.get_oma_fingerprint_from_group(oma_id)
+        
+        # If that fails, try to get it from one of the UniProt members we know
+        if not fingerprint:
+            logger.info("Trying to get fingerprint from UniProt members for OMA group %s", oma_id)
+            for uniprot_id in oma_members[oma_id]:
+                fingerprint = self.get_oma_fingerprint_from_uniprot_member(uniprot_id)
+                if fingerprint:
+                    logger.info("Found fingerprint '%s' from UniProt member %s", fingerprint, uniprot_id)
+                    break
+        
+        if not fingerprint:
+            logger.warning("Could not get fingerprint for OMA group %s, skipping this group", oma_id)
+            return None
+        
+        logger.info("Using fingerprint '%s' for OMA group %s", fingerprint, oma_id)
+        
+        # Get all UniProt IDs with this fingerprint
+        oma_uniprot_ids_list = self.get_uniprot_ids_with_oma_fingerprint(fingerprint)
+        
+        if not oma_uniprot_ids_list:
+            logger.warning("No UniProt IDs found for fingerprint '%s'", fingerprint)
+            return None
+        
+        # Filter out UniProt IDs that are already in the Pfam family, in one
+        # pass rather than building a set of every member and then subtracting
+        oma_uniprot_ids = {uniprot_id for uniprot_id in oma_uniprot_ids_list if uniprot_id not in pfam_uniprot_set}
+
+        return OmaDetail(count, len(oma_uniprot_ids_list), fingerprint, oma_uniprot_ids)
+
     def analyze_pfam_family(self, pfam_folder: str, min_count: int = 3) -> Dict:
         pfam_id = self.get_pfam_id_from_folder(pfam_folder)
-        logger.info(f"Starting analysis of Pfam family {pfam_id} from folder {pfam_folder}")
+        logger.info("Starting analysis of Pfam family %s from folder %s", pfam_id, pfam_folder)
 
         pfam_uniprot_ids = self.read_pfam_scores_file(pfam_folder)
         if not pfam_uniprot_ids:
-            logger.error(f"No UniProt IDs found in scores file from {pfam_folder}")
+            logger.error("No UniProt IDs found in scores file from %s", pfam_folder)
             return {}
 
         pfam_uniprot_set = set(pfam_uniprot_ids)
@@ -301,53 +649,25 @@ class PfamOMAAnalyzer:
 
         frequent_omas = self.filter_frequent_omas(oma_mapping, min_count=min_count)
 
-        all_oma_uniprot_ids = set()
-        oma_details = {}
+        # Pfam members of each OMA group, for the fingerprint fallback below
+        oma_members = defaultdict(list)
+        for uniprot_id, mapped_oma in oma_mapping.items():
+            oma_members[mapped_oma].append(uniprot_id)
 
-        for oma_id, count in frequent_omas.items():
-            logger.info(f"Processing OMA group {oma_id} (count: {count})")
-            
-            # First, try to get the fingerprint from the OMA group
-            fingerprint = self.get_oma_fingerprint_from_group(oma_id)
-            
-            # If that fails, try to get it from one of the UniProt members we know
-            if not fingerprint:
-                logger.info(f"Trying to get fingerprint from UniProt members for OMA group {oma_id}")
-                for uniprot_id, mapped_oma in oma_mapping.items():
-                    if mapped_oma == oma_id:
-                        fingerprint = self.get_oma_fingerprint_from_uniprot_member(uniprot_id)
-                        if fingerprint:
-                            logger.info(f"Found fingerprint '{fingerprint}' from UniProt member {uniprot_id}")
-                            break
-            
-            if not fingerprint:
-                logger.warning(f"Could not get fingerprint for OMA group {oma_id}, skipping this group")
-                continue
-            
-            logger.info(f"Using fingerprint '{fingerprint}' for OMA group {oma_id}")
-            
-            # Get all UniProt IDs with this fingerprint
-            oma_uniprot_ids_list = self.get_uniprot_ids_with_oma_fingerprint(fingerprint)
-            
-            if not oma_uniprot_ids_list:
-                logger.warning(f"No UniProt IDs found for fingerprint '{fingerprint}'")
-                continue
-            
-            # Filter out UniProt IDs that are already in the Pfam family
-            oma_uniprot_ids = set(oma_uniprot_ids_list) - pfam_uniprot_set
-
-            all_oma_uniprot_ids.update(oma_uniprot_ids)
+        oma_details = {}
 
-            oma_details[oma_id] = {
-                'count': count,
-                'total_members': len(oma_uniprot_ids_list),
-                'fingerprint': fingerprint,
-                'uniprot_ids': oma_uniprot_ids
-            }
+        # Groups are independent, so they are processed concurrently; the
+        # shared rate limiter paces the requests
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self._process_one_group, oma_id, count, oma_members, pfam_uniprot_set): oma_id
+                       for oma_id, count in frequent_omas.items()}
 
-            time.sleep(self.request_delay)
+            for future in as_completed(futures):
+                details = future.result()
+                if details is not None:
+                    oma_details[futures[future]] = details
 
-        unique_to_oma = all_oma_uniprot_ids
+        unique_to_oma = set().union(*(details.uniprot_ids for details in oma_details.values()))
         results = {
             'pfam_id': pfam_id,
             'pfam_folder': pfam_folder,
@@ -361,91 +681,87 @@ class PfamOMAAnalyzer:
             'unique_to_oma_ids': list(unique_to_oma)
         }
 
-        logger.info(f"Analysis complete. Found {len(unique_to_oma)} UniProt IDs unique to OMA")
+        logger.info("Analysis complete. Found %d UniProt IDs unique to OMA", len(unique_to_oma))
         return results
 
     def generate_report(self, results: Dict, output_file: str = "report.txt") -> str:
+        """
+        Write the report to output_file section by section through a large
+        buffer, rather than building the whole text in memory first.
+        """
         if not results:
             return "No results to report."
 
-        lines = []
-        lines.append("="*80)
-        lines.append(f"PFAM-OMA ORTHOLOG ANALYSIS REPORT")
-        lines.append("="*80)
-        lines.append(f"Pfam Family: {results['pfam_id']}")
-        lines.append(f"Minimum Count Threshold: {results['min_count']}")
-        lines.append(f"Analysis Date: {time.strftime('%Y-%m-%d %H:%M:%S')}")
-        lines.append("")
-        lines.append("SUMMARY STATISTICS")
-        lines.append("-" * 50)
-        lines.append(f"Total UniProt IDs in Pfam family: {results['pfam_uniprot_count']}")
-        lines.append(f"UniProt IDs with OMA fingerprints: {len(results['oma_mapping'])}")
-        lines.append(f"Frequent OMA groups (>={results['min_count']} occurrences): {len(results['frequent_omas'])}")
-        lines.append(f"UniProt IDs unique to OMA: {results['unique_to_oma_count']}")
-        lines.append("")
-
-        lines.append(f"FREQUENT OMA GROUPS (>={results['min_count']} occurrences)")
-        lines.append("-" * 50)
-        for oma_id, count in results['frequent_omas'].items():
-            fingerprint = results['oma_details'].get(oma_id, {}).get('fingerprint', 'Unknown')
-            total_members = results['oma_details'].get(oma_id, {}).get('total_members', 0)
-            lines.append(f"{oma_id} (fingerprint: {fingerprint}): {count} occurrences in Pfam, {total_members} total valid members")
-        lines.append("")
-
+        # Descriptions are fetched up front, so the file is only open while writing.
+        # Every unique ID is asked for once, in sorted order so the batches (and
+        # so the cached responses) are the same from run to run.
+        descriptions = {}
         if results['unique_to_oma_ids']:
-            lines.append("UNIPROT IDs UNIQUE TO OMA (Not in Pfam)")
-            lines.append("-" * 50)
-            
-            # Group by OMA group for better organization
-            oma_group_proteins = {}
-            
             logger.info("Fetching UniProt descriptions...")
-            for oma_id, details in results['oma_details'].items():
-                if details['uniprot_ids']:
-                    oma_group_proteins[oma_id] = []
-                    for uniprot_id in details['uniprot_ids']:
-                        # Get description
-                        description = self.get_uniprot_description(uniprot_id)
-                        oma_group_proteins[oma_id].append({
-                            'uniprot_id': uniprot_id,
-                            'description': description
-                        })
-            
-            # Sort OMA groups by ID for consistent output
-            for oma_id in sorted(oma_group_proteins.keys()):
-                fingerprint = results['oma_details'][oma_id]['fingerprint']
-                lines.append(f"OMA GROUP: {oma_id} (Fingerprint: {fingerprint})")
-                lines.append("=" * 60)
-                
-                # Sort by UniProt ID
-                sorted_entries = sorted(oma_group_proteins[oma_id], key=lambda x: x['uniprot_id'])
-                
-                for entry in sorted_entries:
-                    lines.append(f"      {entry['uniprot_id']} | {entry['description']}")
-                
-                lines.append("")
-        else:
-            lines.append("No UniProt IDs found that are unique to OMA groups.")
+            descriptions = self.batch_get_descriptions(sorted(results['unique_to_oma_ids']))
 
-        lines.append("="*80)
-
-        report_text = "\n".join(lines)
-        
-        # Always write to report file
         try:
-            with open(output_file, 'w') as f:
-                f.write(report_text)
-            logger.info(f"Report saved to {output_file}")
+            with open(output_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                f.writelines([
+                    "=" * 80 + "\n",
+                    "PFAM-OMA ORTHOLOG ANALYSIS REPORT\n",
+                    "=" * 80 + "\n",
+                    f"Pfam Family: {results['pfam_id']}\n",
+                    f"Minimum Count Threshold: {results['min_count']}\n",
+                    f"Analysis Date: {time.strftime('%Y-%m-%d %H:%M:%S')}\n",
+                    "\n",
+                    "SUMMARY STATISTICS\n",
+                    "-" * 50 + "\n",
+                    f"Total UniProt IDs in Pfam family: {results['pfam_uniprot_count']}\n",
+                    f"UniProt IDs with OMA fingerprints: {len(results['oma_mapping'])}\n",
+                    f"Frequent OMA groups (>={results['min_count']} occurrences): {len(results['frequent_omas'])}\n",
+                    f"UniProt IDs unique to OMA: {results['unique_to_oma_count']}\n",
+                    "\n"
+                ])
+
+                out = [f"FREQUENT OMA GROUPS (>={results['min_count']} occurrences)\n", "-" * 50 + "\n"]
+                for oma_id, count in results['frequent_omas'].items():
+                    details = results['oma_details'].get(oma_id)
+                    fingerprint = details.fingerprint if details else 'Unknown'
+                    total_members = details.total_members if details else 0
+                    out.append(f"{oma_id} (fingerprint: {fingerprint}): {count} occurrences in Pfam, {total_members} total valid members\n")
+                out.append("\n")
+                f.writelines(out)
+
+                if results['unique_to_oma_ids']:
+                    f.write("UNIPROT IDs UNIQUE TO OMA (Not in Pfam)\n" + "-" * 50 + "\n")
+
+                    # Sort OMA groups by ID for consistent output (group numbers
+                    # from the OMA API and fingerprints from UniProt can be mixed)
+                    for oma_id in sorted(results['oma_details'], key=str):
+                        details = results['oma_details'][oma_id]
+                        if not details.uniprot_ids:
+                            continue
+
+                        out = [f"OMA GROUP: {oma_id} (Fingerprint: {details.fingerprint})\n", "=" * 60 + "\n"]
+                        # Sort by UniProt ID
+                        for uniprot_id in sorted(details.uniprot_ids):
+                            out.append(f"      {uniprot_id} | {descriptions.get(uniprot_id, 'Unknown')}\n")
+                        out.append("\n")
+                        f.writelines(out)
+                else:
+                    f.write("No UniProt IDs found that are unique to OMA groups.\n")
+
+                f.write("=" * 80)
+
+            logger.info("Report saved to %s", output_file)
+            return f"Report successfully written to {output_file}"
+
         except IOError as e:
-            logger.error(f"Failed to write report to {output_file}: {e}")
-        
-        return report_text
+            logger.error("Failed to write report to %s: %s", output_file, e)
+            return f"Error: Failed to write report to {output_file}: {e}"
 
 def main():
     parser = argparse.ArgumentParser(description="Analyze Pfam families vs OMA ortholog groups using local Pfam folder")
     parser.add_argument("pfam_folder", help="Path to Pfam family folder containing the 'scores' file")
     parser.add_argument("--output", "-o", default="report.txt", help="Output file for the report (default: report.txt)")
     parser.add_argument("--min-count", "-c", type=int, default=3, help="Minimum count threshold for OMA groups (default: 3)")
+    parser.add_argument("--no-cache", action="store_true", help="Don't read or write the on-disk caches; fetch everything fresh")
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
 
     args = parser.parse_args()
@@ -453,28 +769,28 @@ def main():
         logging.getLogger().setLevel(logging.DEBUG)
 
     if not os.path.exists(args.pfam_folder) or not os.path.isdir(args.pfam_folder):
-        logger.error(f"Pfam folder not found or is not a directory: {args.pfam_folder}")
+        logger.error("Pfam folder not found or is not a directory: %s", args.pfam_folder)
         sys.exit(1)
 
     scores_file = os.path.join(args.pfam_folder, "scores")
     if not os.path.exists(scores_file):
-        logger.error(f"Scores file not found in Pfam folder: {scores_file}")
+        logger.error("Scores file not found in Pfam folder: %s", scores_file)
         sys.exit(1)
 
     try:
-        analyzer = PfamOMAAnalyzer()
+        analyzer = PfamOMAAnalyzer(use_cache=not args.no_cache)
         results = analyzer.analyze_pfam_family(args.pfam_folder, min_count=args.min_count)
         if not results:
             sys.exit(1)
 
-        report = analyzer.generate_report(results, args.output)
-        print(f"Analysis complete. Report saved to {args.output}")
+        report_status = analyzer.generate_report(results, args.output)
+        print(f"Analysis complete. {report_status}")
 
     except KeyboardInterrupt:
         logger.info("Analysis interrupted by user")
         sys.exit(1)
     except Exception as e:
-        logger.error(f"Analysis failed with error: {e}")
+        logger.error("Analysis failed with error: %s", e)
         sys.exit(1)
 
 if __name__ == "__main__":